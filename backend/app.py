@@ -9,8 +9,10 @@ import logging
 import traceback
 import re
 import subprocess
-import mysql.connector
 from dotenv import load_dotenv
+import storage
+import rollup
+import archive
 
 # === Logging Setup ===
 log_path = "/opt/logix/log/web.log"
@@ -31,15 +33,6 @@ if not load_dotenv(dotenv_path=env_path):
     print(f"❌ env file not found at {env_path}")
     exit(1)
 
-# === MySQL Config ===
-DB_CONFIG = {
-    "host": os.getenv('DB_HOST'),
-    "database": os.getenv('DB_NAME'),
-    "user": os.getenv('DB_USER'),
-    "password": os.getenv('DB_PASSWORD'),
-    "port": int(os.getenv('DB_PORT')),
-}
-
 PORT_NUMBER_APP = int(os.getenv('PORT_NUMBER_APP', '5010'))
 
 # === Path Setup ===
@@ -94,13 +87,28 @@ except Exception as e:
 # === Flask App ===
 app = Flask(__name__, static_folder=None)
 
+# === Rentang grafik: range -> (durasi, resolusi default dalam detik) ===
+# Resolusi 0 = data mentah; selain itu dibaca dari rollup paling kasar yang
+# masih <= resolusi tersebut. Parameter ?resolution= (detik) dapat menimpanya.
+RANGES = {
+    "realtime": (timedelta(minutes=15), 0),
+    "1h": (timedelta(hours=1), 0),
+    "12h": (timedelta(hours=12), 0),
+    "1d": (timedelta(days=1), 0),
+    "3d": (timedelta(days=3), 3600),
+    "7d": (timedelta(days=7), 3600),
+    "30d": (timedelta(days=30), 3600),
+    "1y": (timedelta(days=365), 86400),
+}
+
 # === USB Mount Management ===
 BASE_MOUNT_DIR = "/mnt"
 MOUNTED_USB = []
 
 
 def query_to_dataframe(query, params=None):
-    conn = mysql.connector.connect(**DB_CONFIG)
+    # Backend MySQL / SQLite dipilih lewat DB_BACKEND di config/env
+    conn = storage.connect()
     cursor = conn.cursor(dictionary=True)
     cursor.execute(query, params or ())
     rows = cursor.fetchall()
@@ -112,6 +120,24 @@ def query_to_dataframe(query, params=None):
     return df
 
 
+def history_source(range_time):
+    """Return (start_time, tabel rollup atau None untuk data mentah) sesuai range dan ?resolution=."""
+    span, resolution = RANGES.get(range_time, RANGES["realtime"])
+    resolution = request.args.get('resolution', resolution, type=int)
+    return datetime.now() - span, rollup.pick_level(resolution)
+
+
+def query_rollup(table, param, start_time):
+    conn = storage.connect()
+    try:
+        cursor = conn.cursor()
+        series = rollup.query_series(cursor, table, param, start_time)
+        cursor.close()
+    finally:
+        conn.close()
+    return series
+
+
 def get_usb_devices():
     devices = []
     try:
@@ -186,16 +212,9 @@ def latest_data():
         if not params:
             return jsonify({"error": "No parameters defined in config"}), 400
 
+        # Tabel latest (satu baris) diperbarui writer config.py setiap insert
         param_fields = ', '.join(params + ["date"])
-        query = f"""
-                    SELECT {param_fields}
-                    FROM (
-                        SELECT {param_fields} FROM data
-                        UNION ALL
-                        SELECT {param_fields} FROM tmp
-                    ) AS combined
-                    ORDER BY date DESC LIMIT 1
-                """
+        query = f"SELECT {param_fields} FROM latest WHERE id = 1"
         df = query_to_dataframe(query)
 
         if df.empty:
@@ -215,35 +234,41 @@ def latest_data():
 def history_data():
     param = request.args.get('param', 'temp')
     range_time = request.args.get('range', 'realtime')
-    now = datetime.now()
-    start_time = {
-        "realtime": now - timedelta(minutes=15),
-        "1h": now - timedelta(hours=1),
-        "12h": now - timedelta(hours=12),
-        "1d": now - timedelta(days=1),
-        "3d": now - timedelta(days=3),
-        "7d": now - timedelta(days=7)
-    }.get(range_time, now - timedelta(minutes=15))
+    start_time, table = history_source(range_time)
 
     try:
+        if table:
+            # Nama param rollup huruf kecil (PARAMETERS dapat berisi mis. pH)
+            if param.lower() not in rollup.PARAMS:
+                return jsonify({"timestamps": [], "values": []})
+            series = query_rollup(table, param.lower(), start_time)
+            return jsonify({
+                "timestamps": [str(bucket) for bucket, *_ in series],
+                "values": [avg for _, avg, *_ in series],
+                "min": [vmin for _, _, vmin, _, _ in series],
+                "max": [vmax for _, _, _, vmax, _ in series],
+                "resolution": rollup.LEVELS[table]
+            })
+
         query = f"""
             SELECT date, {param}
             FROM (
-                SELECT date, {param} FROM data
+                SELECT date, {param} FROM data WHERE date >= %s
                 UNION ALL
-                SELECT date, {param} FROM tmp
+                SELECT date, {param} FROM tmp WHERE date >= %s
             ) AS combined
-            WHERE date >= %s
             ORDER BY date ASC;
         """
-        df = query_to_dataframe(query, (start_time,))
+        # Filter date di tiap cabang UNION agar MySQL hanya membaca partisi yang perlu
+        df = query_to_dataframe(query, (start_time, start_time))
 
         if param not in df.columns:
             return jsonify({"timestamps": [], "values": []})
 
         return jsonify({
             "timestamps": df["date"].astype(str).tolist(),
-            "values": df[param].tolist()
+            "values": df[param].tolist(),
+            "resolution": 0
         })
     except Exception as e:
         print(f"❌ /api/history error: {e}")
@@ -253,29 +278,30 @@ def history_data():
 @app.route('/api/windrose')
 def windrose_data():
     range_time = request.args.get('range', 'realtime')
-    now = datetime.now()
-    start_time = {
-        "realtime": now - timedelta(minutes=15),
-        "1h": now - timedelta(hours=1),
-        "12h": now - timedelta(hours=12),
-        "1d": now - timedelta(days=1),
-        "3d": now - timedelta(days=3),
-        "7d": now - timedelta(days=7)
-    }.get(range_time, now - timedelta(minutes=15))
+    start_time, table = history_source(range_time)
 
     try:
-        
+        if table:
+            # Per bucket: kecepatan rata-rata dan arah rata-rata vektor
+            speeds = {bucket: avg for bucket, avg, *_ in query_rollup(table, "wspeed", start_time)}
+            series = [(bucket, speeds.get(bucket), avg) for bucket, avg, *_ in query_rollup(table, "wdir", start_time)]
+            return jsonify({
+                "timestamps": [str(bucket) for bucket, _, _ in series],
+                "wspeed": [wspeed for _, wspeed, _ in series],
+                "wdir": [wdir for _, _, wdir in series],
+                "resolution": rollup.LEVELS[table]
+            })
+
         query = f"""
             SELECT date, wspeed, wdir
             FROM (
-                SELECT date,  wspeed, wdir FROM data
+                SELECT date,  wspeed, wdir FROM data WHERE date >= %s
                 UNION ALL
-                SELECT date,  wspeed, wdir FROM tmp
+                SELECT date,  wspeed, wdir FROM tmp WHERE date >= %s
             ) AS combined
-            WHERE date >= %s
             ORDER BY date ASC;
         """
-        df = query_to_dataframe(query, (start_time,))
+        df = query_to_dataframe(query, (start_time, start_time))
 
         # Ganti NaN dengan None agar JSON valid
         df.fillna(value=pd.NA, inplace=True)
@@ -287,7 +313,8 @@ def windrose_data():
         return jsonify({
             "timestamps": df["date"].astype(str).tolist(),
             "wspeed": df["wspeed"].tolist(),
-            "wdir": df["wdir"].tolist()
+            "wdir": df["wdir"].tolist(),
+            "resolution": 0
         })
 
     except Exception as e:
@@ -330,13 +357,19 @@ def export_data():
 
         query = """
             SELECT * FROM (
-                SELECT * FROM data
+                SELECT * FROM data WHERE date BETWEEN %s AND %s
                 UNION ALL
-                SELECT * FROM tmp
+                SELECT * FROM tmp WHERE date BETWEEN %s AND %s
             ) AS combined
-            WHERE date BETWEEN %s AND %s ORDER BY date ASC;
+            ORDER BY date ASC;
         """
-        df = query_to_dataframe(query, (start_dt, end_dt))
+        df = query_to_dataframe(query, (start_dt, end_dt, start_dt, end_dt))
+
+        # Bulan yang sudah dipindahkan ke arsip kolumnar dibaca dari file
+        archived = archive.read_frame(start_dt, end_dt)
+        if not archived.empty:
+            df = pd.concat([archived, df], ignore_index=True) if not df.empty else archived
+            df = df.astype(object).where(pd.notnull(df), None)
 
         if df.empty:
             return jsonify({"error": "Tidak ada data dalam rentang waktu tersebut."}), 400
@@ -0,0 +1,280 @@
+import argparse
+import os
+from datetime import date, datetime
+
+import numpy as np
+
+import partitions
+import rollup
+
+# =============================
+# Arsip kolumnar bulanan tabel data
+# =============================
+# Bulan yang sudah lewat dipindahkan dari MySQL ke file data_YYYY-MM.npz
+# (np.savez_compressed): satu array per kolom, parameter sebagai float32
+# (NULL -> NaN), date / datetime / id sebagai nilai awal + selisih int32,
+# kolom teks sebagai array string ('' untuk NULL).
+
+DEFAULT_ARCHIVE_DIR = "/opt/logix/database/archive"
+EPOCH = datetime(1970, 1, 1)
+
+# Kolom bilangan bulat yang disimpan delta-encoded (date dikonversi ke detik)
+DELTA_COLUMNS = ("id", "date", "datetime")
+INT_COLUMNS = ("has",)
+
+
+def archive_dir():
+    return os.getenv("ARCHIVE_DIR", DEFAULT_ARCHIVE_DIR)
+
+
+def archive_path(month, directory=None):
+    return os.path.join(directory or archive_dir(), f"data_{month.year:04d}-{month.month:02d}.npz")
+
+
+def _delta_encode(values):
+    values = np.asarray(values, dtype=np.int64)
+    if values.size == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32)
+    return values[:1].copy(), np.diff(values, prepend=values[0]).astype(np.int32)
+
+
+def _delta_decode(first, deltas):
+    if deltas.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    return first[0] + np.cumsum(deltas, dtype=np.int64)
+
+
+def _to_seconds(value):
+    if isinstance(value, str):
+        value = datetime.strptime(value[:19], "%Y-%m-%d %H:%M:%S")
+    return int((value - EPOCH).total_seconds())
+
+
+def encode(columns, rows):
+    """
+    Baris (urut date) -> dict array siap disimpan np.savez_compressed.
+    Nama kolom disimpan di `_columns` agar urutan kolom tabel terjaga.
+    """
+    arrays = {"_columns": np.array(columns)}
+    for i, column in enumerate(columns):
+        key = column.lower()
+        values = [row[i] for row in rows]
+        if key in DELTA_COLUMNS:
+            if key == "date":
+                values = [_to_seconds(value) for value in values]
+            else:
+                values = [value or 0 for value in values]
+            arrays[f"{column}.first"], arrays[f"{column}.delta"] = _delta_encode(values)
+        elif key in rollup.PARAMS:
+            arrays[column] = np.array([np.nan if value is None else value for value in values], dtype=np.float32)
+        elif key in INT_COLUMNS:
+            arrays[column] = np.array([value or 0 for value in values], dtype=np.int32)
+        else:
+            arrays[column] = np.array(["" if value is None else str(value) for value in values], dtype=str)
+    return arrays
+
+
+def decode(arrays):
+    """Isi file arsip -> (list nama kolom, dict kolom -> array); date sebagai datetime64[s]."""
+    columns = [str(column) for column in arrays["_columns"]]
+    data = {}
+    for column in columns:
+        if f"{column}.delta" in arrays:
+            values = _delta_decode(arrays[f"{column}.first"], arrays[f"{column}.delta"])
+            data[column] = values.astype("datetime64[s]") if column.lower() == "date" else values
+        else:
+            data[column] = arrays[column]
+    return columns, data
+
+
+def _load(path):
+    with np.load(path, allow_pickle=False) as arrays:
+        return decode(arrays)
+
+
+def _save(path, columns, data):
+    """Tulis atomik (file sementara lalu rename) agar arsip tidak pernah setengah jadi."""
+    arrays = {"_columns": np.array(columns)}
+    for column in columns:
+        values = data[column]
+        if column.lower() in DELTA_COLUMNS:
+            if column.lower() == "date":
+                values = values.astype("datetime64[s]").astype(np.int64)
+            arrays[f"{column}.first"], arrays[f"{column}.delta"] = _delta_encode(values)
+        else:
+            arrays[column] = values
+    tmp_path = path + ".tmp.npz"
+    np.savez_compressed(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+
+
+def months_between(start, end):
+    month = date(start.year, start.month, 1)
+    while month <= date(end.year, end.month, 1):
+        yield month
+        month = partitions.add_months(month, 1)
+
+
+def read_range(start, end, columns=None, directory=None):
+    """
+    Membaca arsip untuk start <= date <= end.
+
+    Return:
+        (list nama kolom, dict kolom -> array numpy). Kolom teks berisi '' untuk NULL.
+    """
+    names, parts = None, []
+    start64, end64 = np.datetime64(start, "s"), np.datetime64(end, "s")
+    for month in months_between(start, end):
+        path = archive_path(month, directory)
+        if not os.path.exists(path):
+            continue
+        file_columns, data = _load(path)
+        date_column = next(column for column in file_columns if column.lower() == "date")
+        mask = (data[date_column] >= start64) & (data[date_column] <= end64)
+        if not mask.any():
+            continue
+        names = names or [column for column in file_columns if columns is None or column in columns]
+        parts.append({column: data[column][mask] for column in names})
+    if not parts:
+        return [], {}
+    return names, {column: np.concatenate([part[column] for part in parts]) for column in names}
+
+
+def read_frame(start, end, columns=None, directory=None):
+    """read_range() sebagai pandas DataFrame (NULL sebagai None / NaN), untuk export dan analitik."""
+    import pandas as pd
+    names, data = read_range(start, end, columns, directory)
+    df = pd.DataFrame({column: data[column] for column in names}, columns=names)
+    for column in names:
+        if df[column].dtype == np.float32:
+            # float32 -> float64 dibulatkan agar 7.1 tidak tertulis 7.099999904632568
+            df[column] = df[column].astype(np.float64).round(4)
+        elif pd.api.types.is_string_dtype(df[column].dtype):
+            df[column] = df[column].astype(object).where(df[column] != "", None)
+    return df
+
+
+def _own_partition(cursor, start, end):
+    """
+    Nama partisi yang hanya berisi bulan [start, end): batas atasnya `end` dan
+    tidak ada baris sebelum `start` di dalamnya (partisi bulan sebelumnya boleh
+    sudah di-drop). None jika tidak ada.
+    """
+    for name, bound in partitions.list_partitions(cursor):
+        if bound == end:
+            cursor.execute(f"SELECT 1 FROM data PARTITION ({name}) WHERE `date` < %s LIMIT 1", (start,))
+            return None if cursor.fetchall() else name
+    return None
+
+
+def archive_month(conn, month, directory=None):
+    """
+    Memindahkan satu bulan tabel data ke file arsip lalu menghapusnya dari MySQL
+    (DROP PARTITION jika bulan tersebut punya partisi sendiri, selain itu DELETE).
+    Jika file arsip bulan itu sudah ada, baris baru digabung ke dalamnya.
+    Return jumlah baris yang diarsipkan.
+    """
+    start, end = month, partitions.add_months(month, 1)
+    path = archive_path(month, directory)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT * FROM data WHERE `date` >= %s AND `date` < %s ORDER BY `date`, id", (start, end))
+        rows = cursor.fetchall()
+        if not rows:
+            return 0
+        columns = [description[0] for description in cursor.description]
+        _, data = decode(encode(columns, rows))
+
+        if os.path.exists(path):
+            old_columns, old = _load(path)
+            if old_columns != columns:
+                raise RuntimeError(f"kolom arsip {path} berbeda dengan tabel data")
+            data = {column: np.concatenate([old[column], data[column]]) for column in columns}
+            # Urut date; baris dengan id yang sudah ada di arsip (percobaan sebelumnya gagal hapus) dibuang
+            id_column = next(column for column in columns if column.lower() == "id")
+            date_column = next(column for column in columns if column.lower() == "date")
+            keep = np.sort(np.unique(data[id_column], return_index=True)[1])
+            order = keep[np.argsort(data[date_column][keep], kind="stable")]
+            data = {column: values[order] for column, values in data.items()}
+        _save(path, columns, data)
+
+        # Hapus dari MySQL hanya setelah arsip terbaca ulang dan memuat semua baris
+        saved_columns, saved = _load(path)
+        if len(saved[saved_columns[0]]) < len(rows):
+            raise RuntimeError(f"arsip {path} tidak lengkap")
+
+        own = _own_partition(cursor, start, end)
+        if own:
+            cursor.execute(f"ALTER TABLE data DROP PARTITION {own}")
+        else:
+            cursor.execute("DELETE FROM data WHERE `date` >= %s AND `date` < %s", (start, end))
+        conn.commit()
+        print(f"[ARSIP] 📦 {len(rows)} baris {month:%Y-%m} dipindahkan ke {path} ({os.path.getsize(path) / 1024:.0f} KB).")
+        return len(rows)
+    finally:
+        cursor.close()
+
+
+def archive_closed_months(conn, keep_months, directory=None):
+    """
+    Mengarsipkan semua bulan yang lebih lama dari bulan ini - `keep_months`.
+    Bulan yang masih punya baris di tmp (belum terkirim KLHK) atau has = 0
+    (belum terkirim HAS, jika HAS aktif) dilewati.
+    """
+    boundary = partitions.add_months(date.today(), -keep_months)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT MIN(`date`) FROM data WHERE `date` < %s", (boundary,))
+        first = cursor.fetchone()[0]
+        if first is None:
+            return 0
+        # SQLite mengembalikan hasil agregat sebagai teks
+        first = rollup.as_datetime(first)
+        total = 0
+        for month in months_between(first, partitions.add_months(boundary, -1)):
+            end = partitions.add_months(month, 1)
+            cursor.execute("SELECT COUNT(*) FROM tmp WHERE `date` >= %s AND `date` < %s", (month, end))
+            pending = cursor.fetchone()[0]
+            if (os.getenv("HAS_STATUS") or "").lower() == "active":
+                cursor.execute("SELECT COUNT(*) FROM data WHERE `date` >= %s AND `date` < %s AND has = 0", (month, end))
+                pending += cursor.fetchone()[0]
+            if pending:
+                print(f"[ARSIP] ⏭️ {month:%Y-%m} dilewati: {pending} baris belum terkirim.")
+                continue
+            total += archive_month(conn, month, directory)
+        return total
+    finally:
+        cursor.close()
+
+
+if __name__ == "__main__":
+    # python archive.py archive            -> arsipkan bulan yang sudah tutup
+    # python archive.py read 2025-01-01 2025-02-01 [--csv out.csv]
+    parser = argparse.ArgumentParser(description="Arsip kolumnar bulanan tabel data")
+    commands = parser.add_subparsers(dest="command", required=True)
+    archive_cmd = commands.add_parser("archive", help="Pindahkan bulan lama dari MySQL ke arsip")
+    archive_cmd.add_argument("--keep", type=int, default=None, help="Jumlah bulan terakhir yang tetap di MySQL")
+    read_cmd = commands.add_parser("read", help="Baca arsip untuk rentang waktu")
+    read_cmd.add_argument("start", help="YYYY-MM-DD[ HH:MM:SS]")
+    read_cmd.add_argument("end", help="YYYY-MM-DD[ HH:MM:SS]")
+    read_cmd.add_argument("--csv", help="Simpan hasil ke file CSV")
+    args = parser.parse_args()
+
+    from env import load_env
+    load_env()
+    if args.command == "archive":
+        import config
+        conn = config.get_connection()
+        try:
+            keep = args.keep if args.keep is not None else int(os.getenv("ARCHIVE_KEEP_MONTHS", "2"))
+            print(f"[ARSIP] ✅ {archive_closed_months(conn, keep)} baris diarsipkan.")
+        finally:
+            conn.close()
+    else:
+        df = read_frame(datetime.fromisoformat(args.start), datetime.fromisoformat(args.end))
+        if args.csv:
+            df.to_csv(args.csv, index=False)
+            print(f"[ARSIP] {len(df)} baris ditulis ke {args.csv}")
+        else:
+            print(df)
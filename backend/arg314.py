@@ -2,10 +2,13 @@
 import time
 import sys
 import os
-import sqlite3
 from dotenv import load_dotenv
 import random
 import threading
+import numpy as np
+from scheduler import IntervalScheduler
+import gpio_ipc
+from gpio_store import GpioStore
 
 # =============================
 # Load Environment
@@ -58,37 +61,21 @@ else:
 # =============================
 # Fungsi Database
 # =============================
-def connect_db():
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    return sqlite3.connect(DB_PATH)
-
-def cekTable():
-    conn = connect_db()
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS gpio (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            date DATETIME,
-            sensor TEXT,
-            nilai REAL DEFAULT 0
-        )
-    ''')
-    conn.commit()
-    conn.close()
+_store = None
+
+def get_store():
+    """Koneksi GpioStore dibuka sekali, saat data pertama perlu disimpan ke SQLite."""
+    global _store
+    if _store is None:
+        _store = GpioStore(DB_PATH)
+    return _store
 
 def insert_data_gpio(date, sensor, nilai):
-    cekTable()
     try:
-        conn = connect_db()
-        cursor = conn.cursor()
-        cursor.execute("INSERT INTO gpio (date, sensor, nilai) VALUES (?, ?, ?);", (date, sensor, nilai))
-        conn.commit()
+        get_store().insert(date, sensor, nilai)
         print(f"[INFO] Data GPIO berhasil dimasukkan: {(date, sensor, nilai)}")
     except Exception as e:
         print(f"[ERROR] Gagal memasukkan data ke database: {e}")
-    finally:
-        if 'cursor' in locals(): cursor.close()
-        if 'conn' in locals(): conn.close()
 
 # =============================
 # Konfigurasi Parameter
@@ -99,14 +86,66 @@ RESOLUTION = float(os.getenv('RESOLUTION'))
 DEFAULT_INTERVAL = int(os.getenv('DELAY'))
 DEBOUNCE_MS = int(os.getenv('DEBOUNCE_MS'))
 DEMO_MODE = os.getenv('DEMO_MODE')
+TIP_BUFFER_SIZE = int(os.getenv('TIP_BUFFER_SIZE', '4096'))
+# Jendela geser intensitas puncak (menit)
+PEAK_WINDOWS = (1, 5, 10)
+
+# =============================
+# Buffer Tipping
+# =============================
+class TipBuffer:
+    """
+    Ring buffer timestamp tipping (detik) yang dialokasikan sekali.
+    Callback GPIO hanya menulis satu timestamp; semua perhitungan dilakukan
+    di loop utama saat batas interval.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.times = np.zeros(capacity)
+        self.count = 0   # total tipping sejak program mulai
+        self.taken = 0   # total tipping yang sudah dihitung pada interval sebelumnya
+        self._lock = threading.Lock()
+
+    def record(self, timestamp):
+        with self._lock:
+            self.times[self.count % self.capacity] = timestamp
+            self.count += 1
+
+    def take_interval(self):
+        """
+        Return (jumlah tipping sejak pemanggilan sebelumnya, array timestamp urut
+        semua tipping yang masih ada di buffer, indeks tipping pertama interval ini).
+        """
+        with self._lock:
+            count = self.count
+            start = count - min(count, self.capacity)
+            times = self.times[np.arange(start, count) % self.capacity]
+        tips = count - self.taken
+        first = max(self.taken, start) - start
+        self.taken = count
+        return tips, times, first
+
+
+def peak_intensity(times, first, window_seconds):
+    """
+    Intensitas puncak (mm/jam) pada jendela geser `window_seconds` yang berakhir
+    di setiap tipping interval ini. Tipping interval sebelumnya yang masih di
+    buffer ikut dihitung di awal jendela.
+    """
+    if first >= len(times):
+        return 0.0
+    ends = times[first:]
+    left = np.searchsorted(times, ends - window_seconds, side='right')
+    counts = np.arange(first, len(times)) - left + 1
+    return round(float(counts.max()) * RESOLUTION * 3600 / window_seconds, 3)
+
 
 # =============================
 # Variabel Global
 # =============================
-tipping_count = 0
-last_logged_minute = -1
+tips = TipBuffer(TIP_BUFFER_SIZE)
 interval_minutes = DEFAULT_INTERVAL
-lock = threading.Lock()
 
 # =============================
 # Setup GPIO berdasarkan modul
@@ -125,11 +164,8 @@ def setup_lgpio():
         gpio.gpio_set_debounce_micros(h, RAIN_SENSOR_PIN, DEBOUNCE_MS * 1000)
         
         def callback(chip, pin, level, tick):
-            global tipping_count
-            if level == 0:  # FALLING edge
-                with lock:
-                    tipping_count += 1
-                print(f"Tipping terdeteksi! Total: {tipping_count}")
+            if level == 0:  # FALLING edge, tick lgpio dalam nanodetik
+                tips.record(tick / 1e9)
         
         gpio.callback(h, RAIN_SENSOR_PIN, gpio.FALLING_EDGE, callback)
         print(f"✅ Rain Gauge Monitor aktif di pin BCM {RAIN_SENSOR_PIN} (lgpio)")
@@ -144,10 +180,7 @@ def setup_rpi_gpio():
         gpio.setup(RAIN_SENSOR_PIN, gpio.IN, pull_up_down=gpio.PUD_UP)
         
         def callback(channel):
-            global tipping_count
-            with lock:
-                tipping_count += 1
-            print(f"Tipping terdeteksi! Total: {tipping_count}")
+            tips.record(time.monotonic())
         
         gpio.add_event_detect(RAIN_SENSOR_PIN, gpio.FALLING, 
                             callback=callback, bouncetime=DEBOUNCE_MS)
@@ -177,33 +210,33 @@ print(f"Interval pembacaan: {interval_minutes} menit")
 # Loop utama
 # =============================
 try:
-    while True:
-        now = time.localtime()
-        current_minute = now.tm_min
-        current_second = now.tm_sec
-
+    # Tunggu tepat di batas interval berikutnya (jam monotonic, tanpa busy-poll)
+    for tick in IntervalScheduler(interval_minutes, name="ARG314"):
         if ARG314_STATUS and ARG314_STATUS.lower() != "active":
-            print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] Sensor ARG314 tidak aktif. Menunggu...")
-            time.sleep(10)
+            print(f"[{tick.strftime('%Y-%m-%d %H:%M:%S')}] Sensor ARG314 tidak aktif. Menunggu...")
             continue
 
-        if current_second == 0 and (current_minute % interval_minutes == 0) and current_minute != last_logged_minute:
-            timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
-
-            if DEMO_MODE and DEMO_MODE.lower() == "active":
-                with lock:
-                    tipping_count = random.randint(0, 60)
-                print(f"[DEMO MODE] Simulasi tipping count: {tipping_count}")
-
-            with lock:
-                rainfall_mm = tipping_count * RESOLUTION
-                tipping_count = 0
-
-            print(f"[{timestamp}] Curah hujan: {rainfall_mm:.3f} mm")
+        timestamp = tick.strftime('%Y-%m-%d %H:%M:%S')
+
+        if DEMO_MODE and DEMO_MODE.lower() == "active":
+            demo_count = random.randint(0, 60)
+            now = time.monotonic()
+            for demo_time in np.sort(np.random.uniform(now - interval_minutes * 60, now, demo_count)):
+                tips.record(demo_time)
+            print(f"[DEMO MODE] Simulasi tipping count: {demo_count}")
+
+        tipping_count, times, first = tips.take_interval()
+        rainfall_mm = tipping_count * RESOLUTION
+        peaks = {minutes: peak_intensity(times, first, minutes * 60) for minutes in PEAK_WINDOWS}
+
+        print(f"[{timestamp}] Curah hujan: {rainfall_mm:.3f} mm ({tipping_count} tipping), intensitas puncak "
+              + ", ".join(f"{minutes} menit: {value} mm/jam" for minutes, value in peaks.items()))
+        # Kirim langsung ke main.py; intensitas dikirim lebih dulu agar sudah ada saat rain_sensor diterima.
+        # SQLite hanya dipakai (untuk total curah hujan) jika main.py tidak berjalan.
+        for minutes, value in peaks.items():
+            gpio_ipc.publish(timestamp, f"rain_peak_{minutes}m", value, quiet=True)
+        if not gpio_ipc.publish(timestamp, "rain_sensor", rainfall_mm):
             insert_data_gpio(timestamp, "rain_sensor", rainfall_mm)
-            last_logged_minute = current_minute
-
-        time.sleep(0.5)
 
 except KeyboardInterrupt:
     print("\nDihentikan oleh user.")
@@ -214,4 +247,6 @@ finally:
         gpio.gpiochip_close(gpio_handle)
     elif module_name == "RPi.GPIO":
         gpio.cleanup()
+    if _store:
+        _store.close()
     print("GPIO ditutup dan program dihentikan.")
\ No newline at end of file
@@ -2,12 +2,15 @@ import os
 import shutil
 import subprocess
 import logging
-import time
 import json
 from datetime import datetime, timedelta
-import mysql.connector
-from mysql.connector import Error
+import sqlite3
+import gzip
 from dotenv import load_dotenv
+from scheduler import IntervalScheduler
+import partitions
+import archive
+import storage
 import pytz
 
 # === Load environment variables ===
@@ -16,6 +19,11 @@ if not load_dotenv(dotenv_path=env_path):
     print(f"[{ambilDate}] Error: env file not found at {env_path}")
     exit(1)
 
+# === Retensi data & partisi ===
+RETENTION_DAYS = int(os.getenv('DATA_RETENTION_DAYS', '396'))   # ±13 bulan
+PARTITION_AHEAD = int(os.getenv('PARTITION_AHEAD', '3'))        # Bulan partisi yang disiapkan di depan
+ARCHIVE_KEEP_MONTHS = int(os.getenv('ARCHIVE_KEEP_MONTHS', '2'))  # Bulan terakhir yang tetap di MySQL
+
 # === Path Konfigurasi ===
 BACKUP_DIR = "/opt/logix/database/backup"
 STATE_FILE = "/opt/logix/database/backup_state.json"
@@ -62,8 +70,11 @@ def save_state(state):
     except Exception as e:
         print(f"[{ambilDate}] ❌ Gagal menyimpan state: {e}")
 
-# === Backup Database (MySQL Dump) ===
+# === Backup Database (MySQL Dump / salinan SQLite) ===
 def backup_database():
+    if storage.is_sqlite():
+        return backup_sqlite()
+
     today_str = datetime.today().strftime('%Y-%m-%d')
     sql_filename = f"logix_db_{today_str}.sql"
     sql_path = os.path.join(BACKUP_DIR, sql_filename)
@@ -93,13 +104,41 @@ def backup_database():
         print(f"[{ambilDate}] ❌ Gagal backup database: {e}")
         return False
 
+def backup_sqlite():
+    """Salinan konsisten file SQLite lewat backup API (aman saat service lain menulis), lalu gzip."""
+    today_str = datetime.today().strftime('%Y-%m-%d')
+    db_path = os.path.join(BACKUP_DIR, f"logix_db_{today_str}.db")
+    gz_path = db_path + ".gz"
+
+    if os.path.exists(gz_path):
+        print("✅ Backup hari ini sudah ada.")
+        return False
+
+    try:
+        src = sqlite3.connect(storage.sqlite_path())
+        dst = sqlite3.connect(db_path)
+        with dst:
+            src.backup(dst)
+        dst.close()
+        src.close()
+
+        with open(db_path, "rb") as f_in, gzip.open(gz_path, "wb") as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(db_path)
+
+        print(f"[{ambilDate}] ✅ Backup berhasil dibuat: {gz_path}")
+        return True
+    except (sqlite3.Error, OSError) as e:
+        print(f"[{ambilDate}] ❌ Gagal backup database: {e}")
+        return False
+
 # === Hapus Backup Lama (> 30 hari) ===
 def cleanup_old_backups():
     cutoff = datetime.today() - timedelta(days=30)
     for fname in os.listdir(BACKUP_DIR):
-        if fname.startswith("logix_db_") and fname.endswith(".sql.gz"):
+        if fname.startswith("logix_db_") and fname.endswith((".sql.gz", ".db.gz")):
             try:
-                date_str = fname.replace("logix_db_", "").replace(".sql.gz", "")
+                date_str = fname.replace("logix_db_", "")[:10]
                 file_date = datetime.strptime(date_str, "%Y-%m-%d")
                 if file_date < cutoff:
                     os.remove(os.path.join(BACKUP_DIR, fname))
@@ -110,28 +149,60 @@ def cleanup_old_backups():
 # === Optimasi Database (hapus >13 bulan) ===
 def optimize_database():
     try:
-        conn = mysql.connector.connect(**MYSQL_CONFIG)
+        conn = storage.connect()
         cur = conn.cursor()
-        cutoff = (datetime.now() - timedelta(days=396)).strftime('%Y-%m-%d %H:%M:%S')
+        cutoff = datetime.now() - timedelta(days=RETENTION_DAYS)
 
-        cur.execute("DELETE FROM data WHERE date < %s", (cutoff,))
-        deleted = cur.rowcount
-        print(f"[{ambilDate}] 🧹 Menghapus {deleted} baris data lebih dari 13 bulan.")
+        if partitions.is_partitioned(cur):
+            # Hapus partisi bulanan utuh: tanpa scan / lock baris dan tanpa undo log
+            dropped = partitions.drop_partitions_before(cur, cutoff)
+            print(f"[{ambilDate}] 🧹 {len(dropped)} partisi data lebih dari 13 bulan dihapus.")
+        else:
+            # Tabel belum dimigrasi ke partisi (service sensor belum pernah start)
+            cur.execute("DELETE FROM data WHERE date < %s", (cutoff.strftime('%Y-%m-%d %H:%M:%S'),))
+            deleted = cur.rowcount
+            print(f"[{ambilDate}] 🧹 Menghapus {deleted} baris data lebih dari 13 bulan.")
 
         conn.commit()
         cur.close()
         conn.close()
         print("✅ Database dioptimasi (tanpa VACUUM untuk MySQL).")
-    except Error as e:
+    except storage.Error as e:
         print(f"[{ambilDate}] ❌ Gagal optimasi database: {e}")
 
+# === Arsipkan bulan lama ke file kolumnar (sebelum retensi) ===
+def archive_old_months():
+    try:
+        conn = storage.connect()
+        rows = archive.archive_closed_months(conn, ARCHIVE_KEEP_MONTHS)
+        print(f"[{ambilDate}] 📦 {rows} baris dipindahkan ke arsip {archive.archive_dir()}.")
+        conn.close()
+    except Exception as e:
+        print(f"[{ambilDate}] ❌ Gagal mengarsipkan data: {e}")
+
+# === Siapkan partisi bulan mendatang ===
+def maintain_partitions():
+    if storage.is_sqlite():
+        return  # SQLite tidak memakai partisi; retensi lewat DELETE
+    try:
+        conn = storage.connect()
+        cur = conn.cursor()
+        created = partitions.ensure_future_partitions(cur, PARTITION_AHEAD)
+        if not created:
+            print(f"[{ambilDate}] 📂 Partisi data sudah siap {PARTITION_AHEAD} bulan ke depan.")
+        cur.close()
+        conn.close()
+    except storage.Error as e:
+        print(f"[{ambilDate}] ❌ Gagal menyiapkan partisi: {e}")
+
 # === Main Loop ===
 def main_loop():
     print("🚀 Memulai background backup mingguan (malam hari)...")
     state = load_state()
+    maintain_partitions()
 
-    while True:
-        now = datetime.now()
+    # Cek tiap 1 jam, tepat di awal jam
+    for now in IntervalScheduler(60, name="BACKUP"):
         hour = now.hour
         today_str = now.strftime('%Y-%m-%d')
 
@@ -150,6 +221,10 @@ def main_loop():
         else:
             do_backup = True
 
+        # Partisi bulan mendatang dicek setiap malam, tidak menunggu backup mingguan
+        if 0 <= hour < 1:
+            maintain_partitions()
+
         # Jalankan hanya malam hari (00:00–01:00)
         if 0 <= hour < 1 and do_backup:
             print(f"[{ambilDate}] 🌙 Malam hari & waktunya backup mingguan. Menjalankan proses...")
@@ -157,6 +232,7 @@ def main_loop():
                 state["last_backup"] = today_str
                 save_state(state)
                 cleanup_old_backups()
+                archive_old_months()
                 optimize_database()
         else:
             if not do_backup:
@@ -164,8 +240,6 @@ def main_loop():
             elif not (0 <= hour < 1):
                 print(f"[{ambilDate}] 🕓 Bukan malam hari. Menunggu waktu 00:00–01:00.")
 
-        time.sleep(3600)  # cek tiap 1 jam
-
 # === Entry Point ===
 if __name__ == "__main__":
     try:
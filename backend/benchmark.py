@@ -0,0 +1,76 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import metrics
+from drivers import DRIVERS, load_drivers
+from simulator import build_parser, faults_from_args, start_simulator
+
+
+def measure(read, iterations):
+    """Return (array latency detik, jumlah pembacaan lengkap) untuk sejumlah pemanggilan."""
+    latencies = np.empty(iterations)
+    complete = 0
+    for i in range(iterations):
+        start = time.perf_counter()
+        data = read()
+        latencies[i] = time.perf_counter() - start
+        if data and all(value is not None for value in data):
+            complete += 1
+    return latencies, complete
+
+
+def report(label, latencies, complete):
+    ms = latencies * 1000
+    print(f"{label:<10} {len(ms):>5} {complete / len(ms) * 100:>6.1f}% "
+          f"{ms.mean():>9.1f} {np.percentile(ms, 50):>9.1f} {np.percentile(ms, 95):>9.1f} {ms.max():>9.1f} "
+          f"{len(ms) / latencies.sum():>8.1f}")
+
+
+def main():
+    parser = build_parser(description="Benchmark latency dan throughput get_*_data() terhadap sensor virtual")
+    parser.add_argument('--iterations', type=int, default=50, help="Jumlah pembacaan per sensor")
+    parser.add_argument('--breaker', action='store_true', help="Aktifkan circuit breaker seperti di produksi")
+    parser.add_argument('--metrics', help="Tulis metrik latency per register ke file JSON ini")
+    args = parser.parse_args()
+
+    names = args.sensors or list(DRIVERS)
+    env, sensors, stop = start_simulator(names, faults_from_args(args))
+    os.environ.update(env)
+    if not args.breaker:
+        # Tanpa breaker agar setiap iterasi benar-benar membaca sensor
+        os.environ['BREAKER_THRESHOLD'] = str(10 ** 9)
+    # Import driver setelah env simulator dipasang (load_dotenv tidak menimpa env yang sudah ada)
+    drivers = {name: read for name, _, _, read in load_drivers(names)}
+
+    # Pemanasan: buka port (settle) dan susun rencana blok sebelum pengukuran
+    for read in drivers.values():
+        read()
+
+    results = {name: measure(read, args.iterations) for name, read in drivers.items()}
+
+    # Satu siklus = semua sensor dibaca paralel (setiap sensor virtual punya bus sendiri)
+    cycle = np.empty(args.iterations)
+    with ThreadPoolExecutor(max_workers=len(drivers)) as executor:
+        for i in range(args.iterations):
+            start = time.perf_counter()
+            list(executor.map(lambda read: read(), drivers.values()))
+            cycle[i] = time.perf_counter() - start
+    stop.set()
+
+    print(f"\n=== BENCHMARK ({args.iterations} iterasi, latency {args.latency} ms ±{args.jitter}, "
+          f"drop {args.drop}, crc {args.corrupt}) ===")
+    print(f"{'sensor':<10} {'n':>5} {'lengkap':>7} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'baca/s':>8}")
+    for name, (latencies, complete) in results.items():
+        report(name, latencies, complete)
+    report("SIKLUS", cycle, args.iterations)
+    print("\n" + ", ".join(f"{name}: {s.requests} req, {s.dropped} drop, {s.corrupted} crc" for name, s in sensors.items()))
+    if args.metrics:
+        metrics.dump(args.metrics)
+        print(f"[METRICS] Metrik ditulis ke {args.metrics}")
+
+
+if __name__ == "__main__":
+    main()
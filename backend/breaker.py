@@ -0,0 +1,70 @@
+import threading
+import time
+from collections import deque
+
+
+class CircuitBreaker:
+    """
+    State machine kesehatan per sensor (closed / open / half-open).
+
+    closed    : sensor sehat, dibaca normal dengan jumlah retry yang disesuaikan
+                dengan tingkat keberhasilan terakhir.
+    open      : setelah `threshold` kegagalan berturut-turut sensor dilewati,
+                sehingga tidak menghabiskan waktu siklus sensor lain.
+    half-open : setelah `probe_interval` detik satu kali probe (tanpa retry)
+                dilakukan; berhasil -> closed, gagal -> open lagi.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, name, threshold=3, probe_interval=60, window=20):
+        self.name = name
+        self.threshold = threshold
+        self.probe_interval = probe_interval
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.history = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """True jika sensor boleh dibaca pada siklus ini."""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.probe_interval:
+                    return False
+                self.state = self.HALF_OPEN
+                print(f"[BREAKER] 🔎 {self.name}: half-open, mencoba probe.")
+            return True
+
+    def success_rate(self):
+        with self._lock:
+            if not self.history:
+                return 1.0
+            return sum(self.history) / len(self.history)
+
+    def retry_budget(self, max_retries):
+        """Jumlah percobaan per blok, diperkecil sesuai tingkat keberhasilan terakhir."""
+        if self.state == self.HALF_OPEN:
+            return 1
+        return max(1, round(max_retries * self.success_rate()))
+
+    def record_success(self):
+        with self._lock:
+            self.history.append(True)
+            self.failures = 0
+            if self.state != self.CLOSED:
+                print(f"[BREAKER] ✅ {self.name}: pulih, kembali closed.")
+            self.state = self.CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self.history.append(False)
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.threshold):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                print(f"[BREAKER] ⛔ {self.name}: open setelah {self.failures} kegagalan berturut-turut, "
+                      f"probe berikutnya dalam {self.probe_interval} detik.")
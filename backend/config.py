@@ -1,34 +1,50 @@
-import mysql.connector
-from dotenv import load_dotenv
+from env import load_env
+import migrations
+import storage
+import rollup
+import latest
+from journal import Journal
 import os
+import atexit
+import csv
+import json
+import math
 import pytz
+import itertools
+import queue
+import threading
 import time
 from datetime import datetime
 
 
 # Load environment variables
-env_path = "/opt/logix/config/env"  # env file path
-if not load_dotenv(dotenv_path=env_path):
-    print(f"Error: env file not found at {env_path}")
-    exit(1)
+load_env()
 
 
-HOST = os.getenv('DB_HOST')
-USER = os.getenv('DB_USER')
-PASSWORD = os.getenv('DB_PASSWORD')
-DATABASE = os.getenv('DB_NAME')
-PORT = os.getenv('DB_PORT')
 TIMEZONE = os.getenv('TIMEZONE')
 DEVICE = os.getenv('DEVICE_ID','TestDevice')
 
-# MySQL connection configuration
-MYSQL_CONFIG = {
-    'host': HOST,
-    'user': USER,
-    'password': PASSWORD,
-    'database': DATABASE,
-    'port': PORT
-}
+# MySQL connection configuration (DB_BACKEND=mysql)
+MYSQL_CONFIG = storage.mysql_config()
+
+# Pool koneksi MySQL, dibuat saat pertama kali dipakai
+POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '3'))
+_pool = None
+_pool_lock = threading.Lock()
+_schema_ready = False
+
+# Koneksi + cursor prepared milik thread penulis, dipakai ulang antar siklus
+_insert_conn = None
+_insert_cursor = None
+
+# Antrian baris dari insert_data() ke thread penulis; baris yang gagal masuk MySQL disimpan di journal lokal
+JOURNAL_BATCH = int(os.getenv('JOURNAL_BATCH', '500'))
+JOURNAL_REPLAY_INTERVAL = int(os.getenv('JOURNAL_REPLAY_INTERVAL', '30'))
+# Jeda sebelum thread penulis mencoba lagi setelah error tak terduga (detik)
+WRITER_ERROR_DELAY = 5
+_write_queue = queue.Queue()
+_writer = None
+_journal = None
 
 # Timezone configuration
 tz = pytz.timezone(TIMEZONE)
@@ -40,58 +56,48 @@ def ambilDate():
     date = datetime.now(tz).strftime("%Y-%m-%d %H:%M:%S")
     return date
 
+def epoch_seconds(date):
+    """
+    Nilai kolom datetime (unix) untuk waktu lokal `date` (datetime atau 'YYYY-MM-DD HH:MM:SS').
+    Dipakai baris live (main.py) maupun insert massal agar timestamp yang sama selalu bernilai sama.
+    """
+    return int(time.mktime(rollup.as_datetime(date).timetuple()))
+
 def ambilDateTime():
-    Interval_Timestamp = datetime.strptime(ambilDateAll(), '%Y-%m-%d %H:%M:%S')
-    unix_dt = int(time.mktime(Interval_Timestamp.timetuple()))
-    return unix_dt
+    return epoch_seconds(ambilDateAll())
       
-def cekTable():
+def get_connection():
+    """
+    Mengambil koneksi dari pool MySQL (pool memeriksa koneksi masih hidup);
+    conn.close() mengembalikan koneksi ke pool. Dengan DB_BACKEND=sqlite setiap
+    panggilan membuka koneksi SQLite baru (murah, tanpa server). cekTable()
+    dijalankan sekali per proses pada koneksi pertama.
+    """
+    global _pool, _schema_ready
+    with _pool_lock:
+        if storage.is_sqlite():
+            conn = storage.connect()
+        else:
+            if _pool is None:
+                from mysql.connector import pooling
+                _pool = pooling.MySQLConnectionPool(
+                    pool_name="logix", pool_size=POOL_SIZE, pool_reset_session=True, **MYSQL_CONFIG
+                )
+            conn = _pool.get_connection()
+        if not _schema_ready:
+            _schema_ready = cekTable(conn)
+    return conn
+
+def init_db():
+    """Membuka pool dan menyiapkan skema saat service mulai (dicoba ulang saat insert jika database belum siap)."""
     try:
-        conn = mysql.connector.connect(**MYSQL_CONFIG)
-        cursor = conn.cursor()
-        # Buat tabel jika belum ada
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS data (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                device TEXT,
-                `date` DATETIME,
-                datetime BIGINT DEFAULT 0,
-                pH FLOAT DEFAULT 0,
-                orp FLOAT DEFAULT 0,
-                tds FLOAT DEFAULT 0,
-                conduct FLOAT DEFAULT 0,
-                do FLOAT DEFAULT 0,
-                salinity FLOAT DEFAULT 0,
-                nh3n FLOAT DEFAULT 0,
-                battery FLOAT DEFAULT 0,
-                depth FLOAT DEFAULT 0,
-                flow FLOAT DEFAULT 0,
-                tflow FLOAT DEFAULT 0,
-                turb FLOAT DEFAULT 0,
-                tss FLOAT DEFAULT 0,
-                cod FLOAT DEFAULT 0,
-                bod FLOAT DEFAULT 0,
-                no3 FLOAT DEFAULT 0,
-                atemp FLOAT DEFAULT 0,
-                wtemp FLOAT DEFAULT 0,
-                apress FLOAT DEFAULT 0,
-                wpress FLOAT DEFAULT 0,
-                hum FLOAT DEFAULT 0,
-                wspeed FLOAT DEFAULT 0,
-                wdir FLOAT DEFAULT 0,
-                rain FLOAT DEFAULT 0,
-                srad FLOAT DEFAULT 0,
-                status TEXT,
-                keterangan TEXT,
-                dateterkirim DATETIME,
-                has INT DEFAULT 0 
-            )
-        ''')
-        conn.commit()
+        get_connection().close()
+    except Exception as e:
+        print(f"[{datetime.now()}] Error pada koneksi database: {e}")
 
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tmp (
-                id INT AUTO_INCREMENT PRIMARY KEY,
+# Kolom tabel data / tmp setelah id; urutan harus sama di kedua tabel
+# (klhk/send.py memakai INSERT INTO data SELECT * FROM tmp)
+TABLE_COLUMNS = """
                 device TEXT,
                 `date` DATETIME,
                 datetime BIGINT DEFAULT 0,
@@ -123,65 +129,302 @@ def cekTable():
                 status TEXT,
                 keterangan TEXT,
                 dateterkirim DATETIME,
-                has INT DEFAULT 0 
-            )
-        ''')
+                has INT DEFAULT 0,
+                quality TEXT,
+                stats TEXT
+"""
+
+def cekTable(conn):
+    """Membuat tabel data / tmp jika belum ada lalu menjalankan migrasi skema. Return True jika berhasil."""
+    try:
+        cursor = conn.cursor()
+        # Buat tabel jika belum ada
+        if storage.is_sqlite():
+            id_column = "id INTEGER PRIMARY KEY AUTOINCREMENT"
+        else:
+            id_column = "id INT AUTO_INCREMENT PRIMARY KEY"
+        for table in migrations.TABLES:
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {table} ({id_column},{TABLE_COLUMNS})")
         conn.commit()
+
+        # Kolom baru, tipe kolom dan index diterapkan lewat migrasi berversi
+        migrations.migrate(conn)
+        return True
         
     except Exception as e:
         print(f"[{datetime.now()}] Error pada koneksi database: {e}")
-        return    
+        return False
+    finally:
+        if 'cursor' in locals(): cursor.close()
+
+INSERT_QUERY = """
+    INSERT INTO tmp (device, date, datetime, ph, orp, tds, conduct, do, salinity, nh3n, battery, depth, flow, tflow, turb, tss, cod, bod, no3, atemp,wtemp, apress, wpress, hum, wspeed, wdir, rain, srad, quality, stats)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,  %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s);
+    """
 
-def insert_data(date,  datetime, ph, orp, tds, conduct, do, salinity, nh3n, battery, depth, flow, tflow, turb, tss, cod, bod, no3, atemp,wtemp, apress, wpress, hum, wspeed, wdir, rain, srad):
+def insert_data(date,  datetime, ph, orp, tds, conduct, do, salinity, nh3n, battery, depth, flow, tflow, turb, tss, cod, bod, no3, atemp,wtemp, apress, wpress, hum, wspeed, wdir, rain, srad, quality=None, stats=None):
+    """
+    quality: dict kolom -> flag kualitas (ok / missing / error / timeout), disimpan sebagai JSON.
+    stats: dict kolom -> statistik jendela oversampling (mean, min, max, std, n), disimpan sebagai JSON.
+    """
     
     device = DEVICE
-    cekTable()        
-    query = """
-        INSERT INTO tmp (device, date, datetime, ph, orp, tds, conduct, do, salinity, nh3n, battery, depth, flow, tflow, turb, tss, cod, bod, no3, atemp,wtemp, apress, wpress, hum, wspeed, wdir, rain, srad)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,  %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s);
-        """
-        
-    try:
-        conn = mysql.connector.connect(**MYSQL_CONFIG)
-        cursor = conn.cursor()
+    values = (
+        device,
+        date, datetime,
+        ph, orp, tds, conduct, do, salinity, nh3n, battery, depth, flow, tflow, turb, tss, cod, bod, no3, atemp,wtemp, apress, wpress, hum, wspeed, wdir, rain, srad,
+        json.dumps(quality, separators=(",", ":")) if quality else None,
+        json.dumps(stats, separators=(",", ":")) if stats else None
+    )
+    #values = tuple("NULL" if v is None else v for v in values) # ganti jika None menjadi 0
 
-        values = (
-                device,
-                date, datetime,
-                ph, orp, tds, conduct, do, salinity, nh3n, battery, depth, flow, tflow, turb, tss, cod, bod, no3, atemp,wtemp, apress, wpress, hum, wspeed, wdir, rain, srad
-            )
-            #values = tuple("NULL" if v is None else v for v in values) # ganti jika None menjadi 0
-        cursor.execute(query, values)
-        conn.commit()
+    # Penulisan ke MySQL dilakukan thread penulis, siklus akuisisi tidak menunggu database
+    _start_writer()
+    _write_queue.put(values)
+
+def _start_writer():
+    global _writer, _journal
+    if _writer is None:
+        _journal = Journal()
+        _writer = threading.Thread(target=_writer_loop, daemon=True, name="db-writer")
+        _writer.start()
+        # Baris di antrian tidak hilang saat proses keluar (termasuk SIGTERM yang ditangani main.py)
+        atexit.register(flush_writes)
 
-        print(f"[INFO] Data berhasil dimasukkan: {values}")
+def _writer_loop():
+    """
+    Thread penulis: INSERT langsung jika journal kosong, selain itu (atau jika
+    INSERT gagal) baris masuk journal agar urutan tetap terjaga. Journal
+    dikirim ulang ke tmp per batch setiap ada data baru atau setiap
+    JOURNAL_REPLAY_INTERVAL detik.
+    """
+    values = None
+    while True:
+        try:
+            if values is None:
+                try:
+                    values = _write_queue.get(timeout=JOURNAL_REPLAY_INTERVAL)
+                except queue.Empty:
+                    pass
+
+            if values is not None:
+                backlog = _journal.count()
+                if backlog == 0 and _insert_rows([values]):
+                    print(f"[INFO] Data berhasil dimasukkan: {values}")
+                    values = None
+                    continue
+                _journal.append(values)
+                values = None
+                print(f"[JOURNAL] 💾 Data disimpan ke journal lokal ({backlog + 1} baris menunggu database).")
+                if backlog == 0:
+                    # INSERT baru saja gagal; kirim ulang pada putaran berikutnya
+                    continue
+
+            _replay_journal()
+        except Exception as e:
+            # Mis. journal terkunci / disk penuh: thread tetap hidup, baris yang
+            # belum tersimpan di `values` dicoba lagi pada putaran berikutnya
+            print(f"[ERROR] Thread penulis gagal memproses data: {e}")
+            time.sleep(WRITER_ERROR_DELAY)
+
+def _replay_journal():
+    """Mengirim isi journal ke tmp dengan executemany per JOURNAL_BATCH baris."""
+    while True:
+        batch = _journal.peek(JOURNAL_BATCH)
+        if not batch:
+            return
+        if not _insert_rows([values for _, values in batch]):
+            return
+        _journal.remove_upto(batch[-1][0])
+        print(f"[JOURNAL] ✅ {len(batch)} baris journal berhasil dikirim ke database.")
+
+def _insert_rows(rows):
+    """
+    INSERT satu baris (statement prepared) atau banyak baris (executemany) ke tmp
+    beserta update rollup dan latest dalam satu commit. Return True jika berhasil.
+    """
+    try:
+        conn, cursor = _get_insert_cursor()
+        if len(rows) == 1:
+            cursor.execute(INSERT_QUERY, rows[0])
+        else:
+            # Cursor biasa: executemany digabung menjadi satu INSERT multi-baris
+            with conn.cursor() as batch_cursor:
+                batch_cursor.executemany(INSERT_QUERY, rows)
+        # Rollup jam / hari dan pembacaan terbaru di transaksi yang sama: replay journal tidak terhitung dua kali
+        with conn.cursor() as summary_cursor:
+            rollup.update(summary_cursor, rows)
+            latest.update(summary_cursor, rows)
+        conn.commit()
+        return True
     except Exception as e:
         print(f"[ERROR] Gagal memasukkan data ke database: {e}")
+        # Koneksi mungkin rusak; buka ulang pada insert berikutnya
+        _close_insert_conn()
+        return False
+
+def flush_writes():
+    """Saat service berhenti: pindahkan baris yang masih di antrian ke journal."""
+    while _journal is not None:
+        try:
+            _journal.append(_write_queue.get_nowait())
+        except queue.Empty:
+            break
+
+def _get_insert_cursor():
+    """
+    Koneksi dan cursor prepared untuk INSERT ke tmp. Statement disiapkan sekali
+    di server lalu dipakai ulang selama koneksi masih hidup.
+    """
+    global _insert_conn, _insert_cursor
+    if _insert_conn is not None and not _insert_conn.is_connected():
+        _close_insert_conn()
+    if _insert_conn is None:
+        _insert_conn = get_connection()
+        _insert_cursor = _insert_conn.cursor(prepared=True)
+    return _insert_conn, _insert_cursor
+
+def _close_insert_conn():
+    global _insert_conn, _insert_cursor
+    try:
+        if _insert_cursor is not None: _insert_cursor.close()
+        if _insert_conn is not None: _insert_conn.close()
+    except Exception:
+        pass
+    _insert_conn = None
+    _insert_cursor = None
+
+# =============================
+# Insert massal (backfill / restore)
+# =============================
+# Kolom yang dapat diisi insert_many(); id selalu dibuat ulang oleh MySQL
+BULK_COLUMNS = ("device", "date", "datetime") + rollup.PARAMS + ("status", "keterangan", "dateterkirim", "has", "quality", "stats")
+BULK_CHUNK = int(os.getenv('BULK_CHUNK', '1000'))
+
+def _bulk_records(records):
+    """
+    Menyeragamkan record menjadi dict kolom (huruf kecil) -> nilai Python.
+    records: iterable dict, atau numpy structured array. NaN / '' menjadi None.
+    """
+    if hasattr(records, "dtype") and records.dtype.names:
+        names = [name.lower() for name in records.dtype.names]
+        # datetime64 -> datetime Python (unit ns akan menjadi int pada tolist())
+        fields = {name: records[name].astype("datetime64[s]") if records[name].dtype.kind == "M" else records[name]
+                  for name in records.dtype.names}
+        records = (dict(zip(names, values)) for values in zip(*(fields[name].tolist() for name in records.dtype.names)))
+    for record in records:
+        row = {}
+        for key, value in record.items():
+            if value == "" or (isinstance(value, float) and math.isnan(value)):
+                value = None
+            row[key.lower()] = value
+        yield row
+
+def _bulk_value(column, value, row):
+    if column == "device" and value is None:
+        return DEVICE
+    if column == "datetime" and value is None and row.get("date") is not None:
+        # Konversi yang sama dengan baris live
+        return epoch_seconds(row["date"])
+    if value is None:
+        return None
+    if column in ("quality", "stats") and not isinstance(value, str):
+        return json.dumps(value, separators=(",", ":"))
+    if column in rollup.PARAMS:
+        return float(value)
+    if column in ("datetime", "has"):
+        return int(float(value))
+    return value
+
+def insert_many(records, table="tmp", chunk_size=None):
+    """
+    Memasukkan banyak record sekaligus ke tmp atau data (tanpa antrian / journal).
+
+    Kolom diambil dari record pertama (nama kolom tidak peka huruf besar; kolom
+    tak dikenal seperti id diabaikan). Setiap chunk dikirim dengan executemany
+    (satu INSERT multi-baris) lalu rollup dan latest diperbarui, satu commit per chunk.
+
+    Return:
+        int: jumlah baris yang dimasukkan.
+    """
+    if table not in ("tmp", "data"):
+        raise ValueError(f"tabel tidak valid: {table}")
+    chunk_size = chunk_size or BULK_CHUNK
+    records = _bulk_records(records)
+    first = next(records, None)
+    if first is None:
+        return 0
+
+    columns = [column for column in BULK_COLUMNS if column in first or column in ("device", "datetime")]
+    query = (f"INSERT INTO {table} ({', '.join(f'`{column}`' for column in columns)}) "
+             f"VALUES ({', '.join(['%s'] * len(columns))})")
+    # Urutan kolom INSERT_QUERY untuk rollup.update() / latest.update()
+    summary_columns = ("device", "date", "datetime") + rollup.PARAMS
+
+    total = 0
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        chunk, summary = [], []
+        for row in itertools.chain([first], records):
+            values = {column: _bulk_value(column, row.get(column), row) for column in set(columns) | set(summary_columns)}
+            chunk.append(tuple(values[column] for column in columns))
+            summary.append(tuple(values[column] for column in summary_columns))
+            if len(chunk) >= chunk_size:
+                total += _insert_chunk(conn, cursor, query, chunk, summary, table, total)
+                chunk, summary = [], []
+        if chunk:
+            total += _insert_chunk(conn, cursor, query, chunk, summary, table, total)
+        cursor.close()
     finally:
-        # Tutup koneksi
-        if 'cursor' in locals(): cursor.close()
-        if 'conn' in locals(): conn.close()
+        conn.close()
+    return total
+
+def _insert_chunk(conn, cursor, query, chunk, summary, table, done):
+    start = time.perf_counter()
+    try:
+        cursor.executemany(query, chunk)
+        rollup.update(cursor, summary)
+        latest.update(cursor, summary)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    elapsed = time.perf_counter() - start
+    print(f"[BULK] {done + len(chunk)} baris masuk ke {table} ({len(chunk) / max(elapsed, 1e-6):.0f} baris/detik).")
+    return len(chunk)
+
+def insert_csv(path, table="data", chunk_size=None):
+    """Memasukkan file CSV hasil /api/export (restore / pindah perangkat). Return jumlah baris."""
+    with open(path, newline="", encoding="utf-8") as f:
+        return insert_many(csv.DictReader(f), table=table, chunk_size=chunk_size)
 
 def ambilDataTerakhir(param_field):
-    
-    # Pastikan nama kolom hanya 1 (bukan daftar), karena kamu pakai untuk filter != NULL
-    query = f"""
-        SELECT {param_field}
-        FROM (
-            SELECT {param_field}, date FROM data
-            UNION ALL
-            SELECT {param_field}, date FROM tmp
-        ) AS combined
-        WHERE {param_field} IS NOT NULL
-        ORDER BY date DESC
-        LIMIT 1
-    """
-    
-    conn = mysql.connector.connect(**MYSQL_CONFIG)
-    cursor = conn.cursor()
-    cursor.execute(query)
-    row = cursor.fetchone()  # ambil satu hasil, bukan semua
-    cursor.close()
-    conn.close()
-    
-    return row[0]
\ No newline at end of file
+    """Nilai non-NULL terakhir satu kolom, dari tabel latest_value (satu lookup primary key)."""
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        value = latest.last_value(cursor, param_field)
+        cursor.close()
+    finally:
+        conn.close()  # kembali ke pool
+
+    return value
+
+
+if __name__ == "__main__":
+    # Restore / pindah data antar perangkat: python config.py import export.csv --table data
+    import argparse
+    parser = argparse.ArgumentParser(description="Import CSV hasil /api/export ke database")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_cmd = commands.add_parser("import", help="Masukkan file CSV")
+    import_cmd.add_argument("files", nargs="+", help="File CSV")
+    import_cmd.add_argument("--table", choices=("data", "tmp"), default="data",
+                            help="data: tidak dikirim ulang ke KLHK, tmp: ikut antrian KLHK")
+    import_cmd.add_argument("--chunk", type=int, default=None, help="Jumlah baris per commit")
+    args = parser.parse_args()
+
+    for path in args.files:
+        start = time.perf_counter()
+        count = insert_csv(path, table=args.table, chunk_size=args.chunk)
+        print(f"[BULK] ✅ {path}: {count} baris dalam {time.perf_counter() - start:.1f} detik.")
@@ -0,0 +1,72 @@
+import importlib
+import os
+import time
+
+from sensor_maps import SENSOR_MAPS
+
+# Registry driver sensor: nama -> (modul, fungsi get_*_data).
+# Modul hanya di-import jika variabel *_STATUS sensor bernilai active.
+DRIVERS = {
+    'AT500': ('at500', 'get_at500_data'),
+    'RT200': ('rt200', 'get_rt200_data'),
+    'SEM5096': ('sem5096', 'get_sem5096_data'),
+    'MACE': ('mace', 'get_mace_data'),
+    'SPECTRO': ('spectro', 'read_modbus_tcp'),
+    'ISCAN': ('iscan', 'get_iscan_data'),
+    'LTNC': ('ltnc', 'get_ltnc_data'),
+    'CONTLYTE': ('contlyte', 'get_conlyte_data'),
+}
+
+
+def is_active(name):
+    status = os.getenv(SENSOR_MAPS[name]['status_env'])
+    return bool(status) and status.lower() == "active"
+
+
+def bus_of(name):
+    """Bus fisik sensor: port serial, atau 'ip:port' untuk Modbus TCP."""
+    port_env = SENSOR_MAPS[name]['port_env']
+    if isinstance(port_env, tuple):
+        ip_env, tcp_port_env = port_env
+        return f"{os.getenv(ip_env)}:{os.getenv(tcp_port_env)}"
+    return os.getenv(port_env)
+
+
+def _rss_kb():
+    """RSS proses saat ini (KB) dari /proc; 0 jika tidak tersedia."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def load_drivers(names=None):
+    """
+    Import driver yang aktif (atau hanya `names` jika diberikan) dan mencetak
+    biaya import per driver (waktu dan pertambahan RSS).
+
+    Return:
+        list: (nama, status, bus, fungsi get_*_data) untuk setiap driver yang berhasil dimuat.
+    """
+    loaded = []
+    total_start, total_rss = time.perf_counter(), _rss_kb()
+    for name, (module_name, function_name) in DRIVERS.items():
+        if names is not None and name not in names:
+            continue
+        if names is None and not is_active(name):
+            continue
+
+        start, rss = time.perf_counter(), _rss_kb()
+        try:
+            read = getattr(importlib.import_module(module_name), function_name)
+        except Exception as e:
+            print(f"[DRIVER] ❌ Gagal memuat driver {name} ({module_name}): {e}")
+            continue
+        print(f"[DRIVER] {name:<9} {module_name}.{function_name}: "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms, +{(_rss_kb() - rss) / 1024:.1f} MB")
+        loaded.append((name, os.getenv(SENSOR_MAPS[name]['status_env']), bus_of(name), read))
+
+    print(f"[DRIVER] {len(loaded)} driver dimuat dalam {(time.perf_counter() - total_start) * 1000:.1f} ms, "
+          f"+{(_rss_kb() - total_rss) / 1024:.1f} MB")
+    return loaded
@@ -0,0 +1,23 @@
+import os
+
+from dotenv import load_dotenv
+
+DEFAULT_ENV_PATH = "/opt/logix/config/env"
+
+# Path file env yang sudah dimuat di proses ini (None = belum)
+_loaded_path = None
+
+
+def load_env():
+    """
+    Memuat file env sekali per proses; pemanggilan berikutnya tidak membaca file lagi.
+    Variabel LOGIX_ENV dapat menunjuk file env lain (mis. untuk pengujian di bench).
+    """
+    global _loaded_path
+    if _loaded_path is None:
+        env_path = os.getenv("LOGIX_ENV", DEFAULT_ENV_PATH)
+        if not load_dotenv(dotenv_path=env_path):
+            print(f"Error: env file not found at {env_path}")
+            exit(1)
+        _loaded_path = env_path
+    return _loaded_path
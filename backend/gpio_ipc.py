@@ -0,0 +1,91 @@
+import json
+import os
+import select
+import socket
+import time
+
+# Socket Unix datagram tempat main.py menerima total interval dari arg314.py
+DEFAULT_SOCKET_PATH = "/opt/logix/data/gpio_logix.sock"
+
+
+def socket_path():
+    return os.getenv("GPIO_SOCKET_PATH", DEFAULT_SOCKET_PATH)
+
+
+def publish(date, sensor, nilai, path=None, quiet=False):
+    """
+    Mengirim total satu interval sensor GPIO ke main.py (satu datagram, tanpa blocking).
+
+    Return:
+        bool: True jika terkirim, False jika penerima tidak berjalan
+        (pemanggil menyimpan data ke SQLite sebagai cadangan).
+    """
+    message = json.dumps({"date": date, "sensor": sensor, "nilai": nilai}).encode()
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            sock.setblocking(False)
+            sock.sendto(message, path or socket_path())
+        return True
+    except (FileNotFoundError, ConnectionRefusedError, BlockingIOError) as e:
+        if not quiet:
+            print(f"[GPIO-IPC] ⚠️ Penerima tidak tersedia ({e.__class__.__name__}), data disimpan ke SQLite.")
+        return False
+
+
+class GpioReceiver:
+    """
+    Penerima datagram GPIO di main.py. Data yang masuk disimpan di memori
+    per (sensor, date) sampai diambil dengan take().
+    """
+
+    def __init__(self, path=None):
+        self.path = path or socket_path()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # Socket sisa proses sebelumnya
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(self.path)
+        self.sock.setblocking(False)
+        self.pending = {}
+        print(f"[GPIO-IPC] 📥 Menerima data GPIO di {self.path}")
+
+    def drain(self):
+        """Membaca semua datagram yang sudah masuk tanpa menunggu."""
+        while True:
+            try:
+                message = self.sock.recv(4096)
+            except BlockingIOError:
+                return
+            try:
+                data = json.loads(message)
+                self.pending[(data["sensor"], data["date"])] = data["nilai"]
+            except (ValueError, KeyError) as e:
+                print(f"[GPIO-IPC] Datagram tidak valid diabaikan: {e}")
+
+    def take(self, sensor, date, timeout=0.0):
+        """
+        Mengambil nilai sensor untuk `date` dan membuang data lama sensor tersebut.
+        Jika belum ada, tunggu datagram paling lama `timeout` detik (kembali
+        segera begitu data masuk).
+
+        Return:
+            float | None: nilai sensor, atau None jika tidak ada data.
+        """
+        deadline = time.monotonic() + timeout
+        self.drain()
+        while (sensor, date) not in self.pending:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                break
+            if select.select([self.sock], [], [], left)[0]:
+                self.drain()
+
+        nilai = self.pending.get((sensor, date))
+        for key in [key for key in self.pending if key[0] == sensor and key[1] <= date]:
+            del self.pending[key]
+        return nilai
+
+    def close(self):
+        self.sock.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
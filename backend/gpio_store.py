@@ -0,0 +1,83 @@
+import os
+import sqlite3
+import threading
+
+DEFAULT_DB_PATH = "/opt/logix/data/gpio_logix.db"
+
+# DELETE ... RETURNING tersedia sejak SQLite 3.35
+HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+
+class GpioStore:
+    """
+    Penyimpanan lokal SQLite untuk sensor GPIO (tabel `gpio`).
+
+    Satu koneksi per proses dengan WAL dan synchronous=NORMAL (satu fsync per
+    checkpoint, bukan per commit). Skema dan index (sensor, date) dibuat sekali
+    saat objek dibuat.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("SQLITE_DB_PATH", DEFAULT_DB_PATH)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS gpio (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    date DATETIME,
+                    sensor TEXT,
+                    nilai REAL DEFAULT 0
+                )
+            ''')
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_gpio_sensor_date ON gpio (sensor, date)")
+            self.conn.commit()
+
+    def insert(self, date, sensor, nilai):
+        self.insert_many([(date, sensor, nilai)])
+
+    def insert_many(self, rows):
+        """rows: iterable (date, sensor, nilai), disimpan dalam satu transaksi."""
+        with self._lock, self.conn:
+            self.conn.executemany("INSERT INTO gpio (date, sensor, nilai) VALUES (?, ?, ?)", rows)
+
+    def consume_all(self, sensor, until):
+        """
+        Mengambil dan menghapus semua data `sensor` dengan date <= `until`
+        dalam satu operasi atomik. Return list (date, nilai) urut waktu.
+        """
+        with self._lock, self.conn:
+            if HAS_RETURNING:
+                rows = self.conn.execute(
+                    "DELETE FROM gpio WHERE sensor = ? AND date <= ? RETURNING date, nilai, id",
+                    (sensor, until)
+                ).fetchall()
+            else:
+                rows = self.conn.execute(
+                    "SELECT date, nilai, id FROM gpio WHERE sensor = ? AND date <= ?", (sensor, until)
+                ).fetchall()
+                self.conn.execute("DELETE FROM gpio WHERE sensor = ? AND date <= ?", (sensor, until))
+        return [(date, nilai) for date, nilai, _ in sorted(rows, key=lambda row: (row[0], row[2]))]
+
+    def consume(self, sensor, date):
+        """
+        Nilai terbaru `sensor` tepat pada `date`; data lama sensor tersebut ikut dihapus.
+        Return float | None.
+        """
+        values = [nilai for row_date, nilai in self.consume_all(sensor, date) if row_date == date]
+        return values[-1] if values else None
+
+    def latest(self, sensor, date):
+        """Nilai terbaru `sensor` tepat pada `date` tanpa menghapus data (memakai index sensor, date)."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT nilai FROM gpio WHERE sensor = ? AND date = ? ORDER BY id DESC LIMIT 1", (sensor, date)
+            ).fetchone()
+        return row[0] if row else None
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
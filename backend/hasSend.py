@@ -4,10 +4,11 @@ import json
 import pytz
 import jwt  # Pastikan ini adalah PyJWT
 import requests
-import mysql.connector
 from datetime import datetime
 from collections import defaultdict
 from dotenv import load_dotenv
+from scheduler import IntervalScheduler
+import storage
 
 # Load environment variables
 env_path = "/opt/logix/config/env"
@@ -17,11 +18,6 @@ if not load_dotenv(dotenv_path=env_path):
 
 # Config from env
 STATUS = os.getenv("HAS_STATUS")
-HOST = os.getenv('DB_HOST')
-USER = os.getenv('DB_USER')
-PASSWORD = os.getenv('DB_PASSWORD')
-DATABASE = os.getenv('DB_NAME')
-PORT = int(os.getenv('DB_PORT'))
 TIMEZONE = os.getenv('TIMEZONE', 'Asia/Jakarta')
 API_ENDPOINT = os.getenv('HAS_API_URL')
 TOKEN_API = os.getenv('HAS_TOKEN_API')
@@ -41,25 +37,24 @@ FIELDS = [field.strip() for field in FIELDS if field.strip()]  # Clean whitespac
 
 tz = pytz.timezone(TIMEZONE)
 
-MYSQL_CONFIG = {
-    'host': HOST,
-    'user': USER,
-    'password': PASSWORD,
-    'database': DATABASE,
-    'port': PORT
-}
-
-
 def write_log(message):
     timestamp = datetime.now(tz).strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{timestamp}] {message}")
 
 
+def batas_datetime(DATE):
+    """
+    Batas kolom datetime (unix) untuk menit DATE ('YYYY-MM-DD HH:MM'): awal menit + 60 detik.
+    Dihitung di Python (mktime, sama dengan epoch_seconds di config.py) agar query sama untuk MySQL dan SQLite.
+    """
+    return int(time.mktime(datetime.strptime(f"{DATE}:00", "%Y-%m-%d %H:%M:%S").timetuple())) + 60
+
+
 def ambil_data(FIELDS,DATE):
     try:
-        with mysql.connector.connect(**MYSQL_CONFIG) as conn:
+        with storage.connect() as conn:
             with conn.cursor() as cursor:
-                cursor.execute(f"SELECT {', '.join(FIELDS)} FROM data WHERE has = '0' AND DATE_FORMAT(FROM_UNIXTIME(datetime), '%Y-%m-%d %H:%i') <= '{DATE}'")
+                cursor.execute(f"SELECT {', '.join(FIELDS)} FROM data WHERE has = 0 AND datetime < %s", [batas_datetime(DATE)])
                 rows = cursor.fetchall()
                 
                 if rows:
@@ -67,7 +62,7 @@ def ambil_data(FIELDS,DATE):
                 else:
                     return None
                 
-    except mysql.connector.Error as e:
+    except storage.Error as e:
         print(f"❌ DB Error: {e}")
         return None
     except Exception as e:
@@ -78,9 +73,9 @@ def ambil_data(FIELDS,DATE):
 
 def ambil_tmp(FIELDS,DATE):
     try:
-        with mysql.connector.connect(**MYSQL_CONFIG) as conn:
+        with storage.connect() as conn:
             with conn.cursor() as cursor:
-                cursor.execute(f"SELECT {', '.join(FIELDS)} FROM tmp WHERE has = '0' AND DATE_FORMAT(FROM_UNIXTIME(datetime), '%Y-%m-%d %H:%i') <= '{DATE}'")
+                cursor.execute(f"SELECT {', '.join(FIELDS)} FROM tmp WHERE has = 0 AND datetime < %s", [batas_datetime(DATE)])
                 rows = cursor.fetchall()
                 
                 if rows:
@@ -88,7 +83,7 @@ def ambil_tmp(FIELDS,DATE):
                 else:
                     return None
                 
-    except mysql.connector.Error as e:
+    except storage.Error as e:
         print(f"❌ DB Error: {e}")
         return None
     except Exception as e:
@@ -179,15 +174,15 @@ def send_data_to_api(FIELDS,DATE):
             print(f"✅ Data untuk tanggal {date} berhasil dikirim ke HAS API.")
             #update status has di database
             try:
-                with mysql.connector.connect(**MYSQL_CONFIG) as conn:
+                with storage.connect() as conn:
                     with conn.cursor() as cursor:
-                        cursor.execute(f"UPDATE data SET has = '1' WHERE DATE_FORMAT(FROM_UNIXTIME(datetime), '%Y-%m-%d %H:%i') <= '{date}'")
+                        cursor.execute("UPDATE data SET has = 1 WHERE has = 0 AND datetime < %s", [batas_datetime(date)])
                         data_updated = cursor.rowcount
-                        cursor.execute(f"UPDATE tmp SET has = '1' WHERE DATE_FORMAT(FROM_UNIXTIME(datetime), '%Y-%m-%d %H:%i') <= '{date}'")
+                        cursor.execute("UPDATE tmp SET has = 1 WHERE has = 0 AND datetime < %s", [batas_datetime(date)])
                         tmp_updated = cursor.rowcount
                         conn.commit()
                         print(f"✅ Status 'has' diperbarui: {data_updated} rows di 'data', {tmp_updated} rows di 'tmp' untuk tanggal {date}")
-            except mysql.connector.Error as e:
+            except storage.Error as e:
                 print(f"❌ DB Error saat memperbarui status 'has': {e}")
             except Exception as e:
                 print(f"❌ Error saat memperbarui status 'has': {e}")
@@ -203,16 +198,10 @@ def send_data_to_api(FIELDS,DATE):
 
 def scheduler():
     print("⏱️ Service aktif. Menunggu jadwal pengiriman data ke HAS API...")
-    last_run = None
     try:
-        while True:
-           #kirim 1 menit 1 kali
-            now = datetime.now(tz)
-            if last_run is None or (now - last_run).total_seconds() >= 60:
-                DATE = now.replace(second=0, microsecond=0)
-                send_data_to_api(FIELDS,DATE)
-                last_run = now
-            time.sleep(5)
+        #kirim 1 menit 1 kali, tepat di awal menit
+        for tick in IntervalScheduler(1, tz=tz, name="HAS"):
+            send_data_to_api(FIELDS, tick)
     except KeyboardInterrupt:
         print("🛑 Service dihentikan manual.")
 
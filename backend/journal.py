@@ -0,0 +1,55 @@
+import json
+import os
+import sqlite3
+import threading
+
+DEFAULT_JOURNAL_PATH = "/opt/logix/data/journal.db"
+
+
+class Journal:
+    """
+    Antrian lokal append-only (SQLite) untuk baris yang belum berhasil masuk MySQL.
+
+    WAL dengan synchronous=NORMAL: commit tidak menunggu fsync, fsync terjadi
+    per checkpoint sehingga tulisan ke SD card dikelompokkan.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("JOURNAL_PATH", DEFAULT_JOURNAL_PATH)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS pending (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    row TEXT NOT NULL
+                )
+            ''')
+            self.conn.commit()
+
+    def append(self, values):
+        """values: tuple nilai kolom INSERT (disimpan sebagai JSON)."""
+        with self._lock, self.conn:
+            self.conn.execute("INSERT INTO pending (row) VALUES (?)", (json.dumps(values),))
+
+    def peek(self, limit):
+        """Return list (id, tuple nilai) paling lama, maksimal `limit` baris."""
+        with self._lock:
+            rows = self.conn.execute("SELECT id, row FROM pending ORDER BY id LIMIT ?", (limit,)).fetchall()
+        return [(row_id, tuple(json.loads(row))) for row_id, row in rows]
+
+    def remove_upto(self, row_id):
+        """Menghapus baris yang sudah berhasil dikirim (id <= row_id)."""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM pending WHERE id <= ?", (row_id,))
+
+    def count(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
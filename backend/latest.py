@@ -0,0 +1,125 @@
+import storage
+from rollup import PARAMS, DATE_INDEX, FIRST_PARAM_INDEX, as_datetime
+
+# =============================
+# Pembacaan terbaru
+# =============================
+# Tabel `latest`: satu baris (id = 1) berisi baris data terbaru, dibaca
+# /api/latest dengan satu lookup primary key.
+# Tabel `latest_value`: per param nilai non-NULL terakhir dan waktunya,
+# pengganti scan UNION data + tmp di ambilDataTerakhir().
+# Keduanya diperbarui writer config.py di transaksi yang sama dengan INSERT;
+# baris yang lebih lama dari isi tabel (mis. replay journal) tidak menimpa.
+
+PARAM_COLUMNS = ", ".join(PARAMS)
+
+# Kolom param diperbarui sebelum `date` agar perbandingan memakai date lama
+LATEST_UPSERT = """
+    INSERT INTO latest (id, `date`, datetime, {columns})
+    VALUES (1, %s, %s, {placeholders})
+    ON DUPLICATE KEY UPDATE
+        {assignments},
+        datetime = IF(VALUES(`date`) >= `date`, VALUES(datetime), datetime),
+        `date` = GREATEST(`date`, VALUES(`date`))
+""".format(
+    columns=PARAM_COLUMNS,
+    placeholders=", ".join(["%s"] * len(PARAMS)),
+    assignments=",\n        ".join(f"{param} = IF(VALUES(`date`) >= `date`, VALUES({param}), {param})" for param in PARAMS),
+)
+
+# SQLite: semua ekspresi SET memakai nilai baris lama, urutan kolom tidak berpengaruh
+LATEST_UPSERT_SQLITE = """
+    INSERT INTO latest (id, `date`, datetime, {columns})
+    VALUES (1, %s, %s, {placeholders})
+    ON CONFLICT (id) DO UPDATE SET
+        {assignments},
+        datetime = CASE WHEN excluded.`date` >= `date` THEN excluded.datetime ELSE datetime END,
+        `date` = max(`date`, excluded.`date`)
+""".format(
+    columns=PARAM_COLUMNS,
+    placeholders=", ".join(["%s"] * len(PARAMS)),
+    assignments=",\n        ".join(f"{param} = CASE WHEN excluded.`date` >= `date` THEN excluded.{param} ELSE {param} END" for param in PARAMS),
+)
+
+VALUE_UPSERT = """
+    INSERT INTO latest_value (param, value, `date`)
+    VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        value = IF(VALUES(`date`) >= `date`, VALUES(value), value),
+        `date` = GREATEST(`date`, VALUES(`date`))
+"""
+
+
+VALUE_UPSERT_SQLITE = """
+    INSERT INTO latest_value (param, value, `date`)
+    VALUES (%s, %s, %s)
+    ON CONFLICT (param) DO UPDATE SET
+        value = CASE WHEN excluded.`date` >= `date` THEN excluded.value ELSE value END,
+        `date` = max(`date`, excluded.`date`)
+"""
+
+
+def create_tables(cursor):
+    param_columns = ",\n".join(f"                {param} FLOAT" for param in PARAMS)
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS latest (
+            id TINYINT PRIMARY KEY,
+            `date` DATETIME NOT NULL,
+            datetime BIGINT DEFAULT 0,
+{param_columns}
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS latest_value (
+            param VARCHAR(16) PRIMARY KEY,
+            value FLOAT,
+            `date` DATETIME NOT NULL
+        )
+    ''')
+
+
+def seed(cursor):
+    """Mengisi latest / latest_value dari data + tmp yang sudah ada (sekali saat migrasi)."""
+    columns = f"`date`, datetime, {PARAM_COLUMNS}"
+    cursor.execute(
+        f"SELECT {columns} FROM (SELECT {columns} FROM data UNION ALL SELECT {columns} FROM tmp) AS combined "
+        f"WHERE `date` IS NOT NULL ORDER BY `date` DESC LIMIT 1"
+    )
+    row = cursor.fetchone()
+    if row:
+        cursor.execute(LATEST_UPSERT, row)
+    for param in PARAMS:
+        cursor.execute(
+            f"SELECT {param}, `date` FROM ("
+            f"(SELECT {param}, `date` FROM data WHERE {param} IS NOT NULL ORDER BY `date` DESC LIMIT 1) UNION ALL "
+            f"(SELECT {param}, `date` FROM tmp WHERE {param} IS NOT NULL ORDER BY `date` DESC LIMIT 1)"
+            f") AS combined ORDER BY `date` DESC LIMIT 1"
+        )
+        row = cursor.fetchone()
+        if row:
+            cursor.execute(VALUE_UPSERT, (param, row[0], row[1]))
+
+
+def update(cursor, rows):
+    """Memperbarui latest dan latest_value dari baris INSERT_QUERY (dalam transaksi pemanggil)."""
+    rows = [(as_datetime(row[DATE_INDEX]), row) for row in rows if row[DATE_INDEX] is not None]
+    if not rows:
+        return
+    sqlite = storage.is_sqlite()
+    _, newest = max(rows, key=lambda item: item[0])
+    cursor.execute(LATEST_UPSERT_SQLITE if sqlite else LATEST_UPSERT, (newest[DATE_INDEX], newest[DATE_INDEX + 1], *newest[FIRST_PARAM_INDEX:FIRST_PARAM_INDEX + len(PARAMS)]))
+
+    values = {}
+    for date, row in rows:
+        for i, param in enumerate(PARAMS, FIRST_PARAM_INDEX):
+            if row[i] is not None and (param not in values or date >= values[param][2]):
+                values[param] = (param, row[i], date)
+    if values:
+        cursor.executemany(VALUE_UPSERT_SQLITE if sqlite else VALUE_UPSERT, list(values.values()))
+
+
+def last_value(cursor, param):
+    """Nilai non-NULL terakhir `param`, atau None."""
+    cursor.execute("SELECT value FROM latest_value WHERE param = %s", (param.lower(),))
+    row = cursor.fetchone()
+    return row[0] if row else None
@@ -1,27 +1,31 @@
 import time
 import os
-from at500 import get_at500_data
-from mace import get_mace_data
-from spectro import read_modbus_tcp
-from rt200 import get_rt200_data
-from sem5096 import get_sem5096_data
-from iscan import get_iscan_data 
-from ltnc import get_ltnc_data 
-from config import insert_data, ambilDate, ambilDateTime
-from datetime import datetime
-from dotenv import load_dotenv
-from contlyte import get_conlyte_data
-import sqlite3
+import signal
+from config import insert_data, init_db, flush_writes, ambilDate, epoch_seconds, tz
+from env import load_env
+from drivers import load_drivers
+from scheduler import IntervalScheduler
+from gpio_ipc import GpioReceiver
+from gpio_store import GpioStore
+from sensor_maps import SENSOR_MAPS
+import metrics
 import pytz
+from concurrent.futures import ThreadPoolExecutor, wait
 
 # Load environment variables
-env_path = "/opt/logix/config/env"
-if not load_dotenv(dotenv_path=env_path):
-    print(f"Error: env file not found at {env_path}")
-    exit(1)
+load_env()
 
 # Configuration from environment variables
 DELAY = int(os.getenv('DELAY'))
+CATCH_UP = os.getenv('CATCH_UP', 'inactive').lower() == "active"
+# Porsi interval DELAY yang boleh dipakai untuk membaca sensor dalam satu siklus
+CYCLE_BUDGET = float(os.getenv('CYCLE_BUDGET', '0.8'))
+# Oversampling: sensor cepat dibaca setiap OVERSAMPLE_PERIOD detik, disimpan rata-rata jendela DELAY
+OVERSAMPLE = os.getenv('OVERSAMPLE', 'inactive').lower() == "active"
+OVERSAMPLE_SENSORS = [name.strip() for name in os.getenv('OVERSAMPLE_SENSORS', 'SEM5096,MACE,SPECTRO').split(',') if name.strip()]
+OVERSAMPLE_PERIOD = float(os.getenv('OVERSAMPLE_PERIOD', '5'))
+# Waktu tunggu maksimum data ARG314 yang belum masuk di socket (detik), kembali segera begitu data tiba
+GPIO_WAIT = float(os.getenv('GPIO_WAIT', '2'))
 AT500_STATUS = os.getenv('AT500_STATUS')
 MACE_STATUS = os.getenv('MACE_STATUS')
 SPECTRO_STATUS = os.getenv('SPECTRO_STATUS')
@@ -32,82 +36,179 @@ ISCAN_STATUS = os.getenv('ISCAN_STATUS')
 LTNC_STATUS = os.getenv('LTNC_STATUS')
 CONTLYTE_STATUS = os.getenv('CONTLYTE_STATUS')
 
-# SQLite Database GPIO
+# Driver sensor aktif: (nama, status, bus fisik, fungsi baca); modul driver hanya di-import jika aktif.
+# Driver dengan bus yang sama (port serial / IP) dibaca berurutan,
+# bus yang berbeda dibaca paralel.
+SENSORS = load_drivers()
+
+executor = ThreadPoolExecutor(max_workers=max(1, len(SENSORS)), thread_name_prefix="bus")
+# Future pembacaan terakhir per bus; bus yang belum selesai tidak dibaca ulang
+_bus_futures = {}
+
+# SQLite Database GPIO (cadangan jika data ARG314 tidak masuk lewat socket)
 DB_PATH = os.getenv("SQLITE_DB_PATH", "/opt/logix/data/gpio_logix.db")
+_gpio_store = None
 
-def connect_db():
-    """Membuka koneksi ke database SQLite."""
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    return sqlite3.connect(DB_PATH)
+def get_gpio_store():
+    """Koneksi GpioStore dibuka sekali, saat cadangan SQLite pertama kali dibutuhkan."""
+    global _gpio_store
+    if _gpio_store is None:
+        _gpio_store = GpioStore(DB_PATH)
+    return _gpio_store
 
 
 def get_sensor_gpio(current_date, sensor, auto_delete=True):
     """
-    Mengambil data terbaru dari tabel gpio berdasarkan nama sensor dan datetime tertentu.
+    Mengambil data dari tabel gpio berdasarkan nama sensor dan datetime tertentu.
     
     Argumen:
         sensor (str): nama sensor, misalnya 'rain_sensor'
         current_date (str): waktu dalam format 'YYYY-MM-DD HH:MM:SS'
-        auto_delete (bool): jika True, hapus data lama di tanggal yang sama setelah dibaca.
+        auto_delete (bool): jika True, data sensor sampai current_date dihapus dalam operasi yang sama.
         
     Return:
-        float | None: nilai sensor terbaru pada tanggal yang sama, atau None jika tidak ada data.
+        float | None: nilai sensor pada tanggal tersebut, atau None jika tidak ada data.
     """
-    
     try:
-        conn = connect_db()
-        cursor = conn.cursor()
-
-        # Ambil data terbaru di tanggal yang sama dengan current_date
-        cursor.execute("""
-            SELECT id, `date`, nilai 
-            FROM gpio
-            WHERE sensor = ?
-              AND `date` = ?
-            ORDER BY `date` DESC
-            LIMIT 1;
-        """, (sensor, current_date))
-        result = cursor.fetchone()
- 
-        if result:
-            latest_id, latest_date, nilai = result
-
-            if auto_delete:
-                # Hapus semua data ketika data sudah diambil
-                cursor.execute("""
-                    DELETE FROM gpio
-                    WHERE sensor = ?
-                      AND `date` <= ?
-                """, (sensor, current_date))
-                conn.commit()
-                print(f"[GPIO] 🔄 Hapus data lama sensor '{sensor}' ")
-
-            print(f"[GPIO] ✅ Data terbaru sensor '{sensor}' untuk {latest_date}: {nilai}")
-            return nilai
-        else:
-            print(f"[GPIO] ⚠️ Tidak ada data sensor '{sensor}' untuk tanggal {current_date}")
-            return None
-
+        store = get_gpio_store()
+        nilai = store.consume(sensor, current_date) if auto_delete else store.latest(sensor, current_date)
     except Exception as e:
         print(f"[ERROR] Gagal mengambil data dari database: {e}")
         return None
 
-    finally:
-        if 'cursor' in locals(): cursor.close()
-        if 'conn' in locals(): conn.close()
+    if nilai is None:
+        print(f"[GPIO] ⚠️ Tidak ada data sensor '{sensor}' untuk tanggal {current_date}")
+    else:
+        print(f"[GPIO] ✅ Data sensor '{sensor}' untuk {current_date}: {nilai}")
+    return nilai
+
+
+def read_bus(bus, drivers, results, usage, deadline):
+    """
+    Membaca semua driver yang berbagi satu bus secara berurutan (satu transaksi pada satu waktu).
+    Hasil tiap driver langsung dicatat ke `results` agar tetap terpakai walaupun
+    driver lain di bus yang sama melewati batas waktu siklus.
+    `deadline` (time.monotonic) dipasang khusus untuk thread ini, sehingga driver
+    yang terlambat tetap berhenti pada batas waktu siklusnya sendiri.
+    """
+    # sensor_engine (numpy, pyserial) sudah dimuat oleh driver aktif
+    from sensor_engine import set_deadline
+    set_deadline(deadline, thread_only=True)
+    start = time.monotonic()
+    for name, read in drivers:
+        driver_start = time.monotonic()
+        try:
+            result = read()
+        except Exception as e:
+            print(f"[ERROR] Driver {name} gagal: {e}")
+            result = None
+        # Waktu dicatat sebelum hasil: nama yang ada di `results` selalu punya `usage`
+        usage[name] = time.monotonic() - driver_start
+        results[name] = result
+    print(f"[BUS] {bus}: {', '.join(name for name, _ in drivers)} selesai dalam {time.monotonic() - start:.2f} detik")
+
+
+def read_all_sensors(budget, exclude=()):
+    """
+    Mengelompokkan driver aktif berdasarkan bus fisik lalu membaca tiap kelompok
+    secara paralel dengan batas waktu `budget` detik. Driver di `exclude`
+    (mis. yang sudah di-oversample) dilewati, begitu juga bus yang masih
+    dipakai pembacaan siklus sebelumnya.
 
+    Return:
+        (dict, list): nama driver -> hasil get_*_data(), dan daftar driver yang
+        belum selesai saat batas waktu tercapai (dibatalkan).
+    """
+    buses = {}
+    for name, status, bus, read in SENSORS:
+        if status and status.lower() == "active" and name not in exclude:
+            key = os.path.realpath(bus) if bus and bus.startswith("/dev/") else bus
+            buses.setdefault(key, []).append((name, read))
+
+    deadline = time.monotonic() + budget
+    results, usage = {}, {}
+    futures = []
+    for bus, drivers in buses.items():
+        previous = _bus_futures.get(bus)
+        if previous is not None and not previous.done():
+            print(f"[DEADLINE] ⏭️ Bus {bus} masih dipakai siklus sebelumnya, dilewati.")
+            continue
+        _bus_futures[bus] = executor.submit(read_bus, bus, drivers, results, usage, deadline)
+        futures.append(_bus_futures[bus])
+    wait(futures, timeout=budget)
+    # Salin hasil saat batas waktu; driver yang terlambat tidak lagi mengubah data siklus ini
+    results, usage = dict(results), dict(usage)
+
+    timed_out = [name for drivers in buses.values() for name, _ in drivers if name not in results]
+    for name in timed_out:
+        print(f"[DEADLINE] ⏰ {name} belum selesai dalam {budget:.0f} detik, hasilnya diabaikan.")
+        metrics.count("deadline", name)
+    report_budget(buses, usage, timed_out, budget)
+    return results, timed_out
+
+
+def report_budget(buses, usage, timed_out, budget):
+    """Mencetak pemakaian batas waktu siklus per driver."""
+    print(f"[BUDGET] Pemakaian waktu siklus (batas {budget:.0f} detik):")
+    for drivers in buses.values():
+        for name, _ in drivers:
+            elapsed = usage.get(name)
+            if name in timed_out:
+                print(f"  → {name}: melewati batas waktu")
+            elif elapsed is not None:
+                print(f"  → {name}: {elapsed:.2f} detik ({elapsed / budget * 100:.0f}%)")
+
+
+def field_quality(sensor_data, timed_out):
+    """
+    Flag kualitas per kolom untuk baris yang disimpan:
+        ok      : nilai berhasil terbaca
+        missing : driver terbaca tetapi field ini kosong
+        error   : driver gagal / port tidak tersedia / breaker open
+        timeout : driver dibatalkan karena melewati batas waktu siklus
+    Kolom yang diisi beberapa driver bernilai ok jika salah satunya berhasil.
+    """
+    quality = {}
+    for name, status, _, _ in SENSORS:
+        if not status or status.lower() != "active":
+            continue
+        data = sensor_data.get(name)
+        for i, field in enumerate(SENSOR_MAPS[name]['outputs']):
+            if name in timed_out:
+                flag = "timeout"
+            elif not data:
+                flag = "error"
+            elif data[i] is None:
+                flag = "missing"
+            else:
+                flag = "ok"
+            if quality.get(field) != "ok":
+                quality[field] = flag
+    return quality
 
 
-def should_run():
-    """Check if the script should run based on the current time and DELAY setting."""
-    now = datetime.now()
-    return now.minute % DELAY == 0 and now.second == 0
+def _terminate(signum, frame):
+    """SIGTERM (systemctl stop / restart) diperlakukan seperti Ctrl+C agar antrian data di-flush."""
+    raise KeyboardInterrupt
 
 
 def main():
     current_date = ambilDate()
+    signal.signal(signal.SIGTERM, _terminate)
+    init_db()
     print(f"[{current_date}] ⏱️ Service dimulai. Menunggu waktu eksekusi sensor setiap {DELAY} menit.")
-    last_run = None
+    scheduler = IntervalScheduler(DELAY, catch_up=CATCH_UP, tz=tz, name="SENSOR")
+    budget = DELAY * 60 * CYCLE_BUDGET
+
+    oversampler = None
+    if OVERSAMPLE:
+        names = [name for name, status, _, _ in SENSORS
+                 if name in OVERSAMPLE_SENSORS and status and status.lower() == "active"]
+        if names:
+            from oversample import Oversampler
+            oversampler = Oversampler(names, OVERSAMPLE_PERIOD, DELAY * 60).start()
+
+    gpio_receiver = GpioReceiver() if ARG314_STATUS.lower() == "active" else None
     
     # Initialize variables with default values (None)
     # ph, orp, tds, conduct, do, salinity, nh3n = (None,) * 7
@@ -116,179 +217,213 @@ def main():
     # wpress, hum, wspeed, wdir, rain, srad = (None,) * 6
     
     try:
-        while True:
+        # Tunggu tepat di batas interval berikutnya (jam monotonic, tanpa busy-poll)
+        for tick in scheduler:
             ph, orp, tds, conduct, do, salinity, nh3n = (None,) * 7
             battery, depth, flow, tflow = (None,) * 4
             turb, tss, cod, bod, no3, atemp, wtemp = (None,) * 7
             apress, wpress, hum, wspeed, wdir, rain, srad = (None,) * 7
-            now = datetime.now()
-            if should_run():
-                # Ensure we don't run twice at the same time
-                if last_run != now.replace(second=0, microsecond=0):
-                    current_date = ambilDate()
-                    current_datetime = ambilDateTime()
-                    print(f"\n[{current_date}] 📡 Membaca semua sensor...")
-                    
-                    status_filter = True
-                    
-                    # === AT500 ===
-                    if AT500_STATUS.lower() == "active":
-                        at500_data = get_at500_data()
-                        if at500_data:
-                            new_ph, new_orp, new_tds, new_conduct, new_do, new_salinity, new_nh3n = at500_data
-                            # Update global variables only if new data is not None
-                            ph = new_ph if new_ph is not None else ph
-                            orp = new_orp if new_orp is not None else orp
-                            tds = new_tds if new_tds is not None else tds
-                            conduct = new_conduct if new_conduct is not None else conduct
-                            do = new_do if new_do is not None else do
-                            salinity = new_salinity if new_salinity is not None else salinity
-                            nh3n = new_nh3n if new_nh3n is not None else nh3n
-                        else:
-                            status_filter = False
-                            print(f"[{current_date}] ⚠️ Gagal membaca data AT500.")
-                    
-                    # === RT200 ===
-                    if RT200_STATUS.lower() == "active":
-                        rt200_data = get_rt200_data()
-                        if rt200_data:
-                            new_temp, new_press, new_depth = rt200_data
-                            # Update global variables only if new data is not None
-                            wtemp = new_temp if new_temp is not None else wtemp
-                            wpress = new_press if new_press is not None else wpress
-                            depth = new_depth if new_depth is not None else depth
-                        else:
-                            status_filter = False
-                            print(f"[{current_date}] ⚠️ Gagal membaca data RT200.")
-                    
-                    # === SEM5096 ===
-                    if SEM5096_STATUS.lower() == "active":
-                        sem5096_data = get_sem5096_data()
-                        if sem5096_data:
-                            new_temp, new_hum, new_press, new_wspeed, new_wdir, new_rain, new_srad = sem5096_data
-                            # Update global variables only if new data is not None
-                            atemp = new_temp if new_temp is not None else atemp
-                            hum = new_hum if new_hum is not None else hum
-                            apress = new_press if new_press is not None else apress
-                            wspeed = new_wspeed if new_wspeed is not None else wspeed
-                            wdir = new_wdir if new_wdir is not None else wdir
-                            rain = new_rain if new_rain is not None else rain
-                            srad = new_srad if new_srad is not None else srad
-                        else:
-                            status_filter = False
-                            print(f"[{current_date}] ⚠️ Gagal membaca data SEM5096.")
-                    
-                    
-                    # === MACE ===
-                    if MACE_STATUS.lower() == "active":
-                        mace_data = get_mace_data()
-                        if mace_data:
-                            new_battery, new_depth, new_flow, new_tflow = mace_data
-                            # Update global variables only if new data is not None
-                            battery = new_battery if new_battery is not None else battery
-                            depth = new_depth if new_depth is not None else depth
-                            flow = new_flow if new_flow is not None else flow
-                            tflow = new_tflow if new_tflow is not None else tflow
-                        else:
-                            status_filter = False
-                            print(f"[{current_date}] ⚠️ Gagal membaca data MACE.")
-                    
-                    # === SPECTRO ===
-                    if SPECTRO_STATUS.lower() == "active":
-                        modbus_data = read_modbus_tcp()
-                        if modbus_data:
-                            new_turb, new_tss, new_cod, new_bod, new_no3, new_temp = modbus_data
-                            # Update global variables only if new data is not None
-                            turb = new_turb if new_turb is not None else turb
-                            tss = new_tss if new_tss is not None else tss
-                            cod = new_cod if new_cod is not None else cod
-                            bod = new_bod if new_bod is not None else bod
-                            no3 = new_no3 if new_no3 is not None else no3
-                            wtemp = new_temp if new_temp is not None else wtemp
-                        else:
-                            status_filter = False
-                            print(f"[{current_date}] ⚠️ Gagal membaca data Modbus TCP.")
-                            
-                    # === ISCAN ===
-                    if ISCAN_STATUS.lower() == "active":
-                        iscan_data = get_iscan_data()
-                        if iscan_data:
-                            new_cod, new_tss, new_temp = iscan_data
-                            # Update global variables only if new data is not None
-                            cod = new_cod if new_cod is not None else cod
-                            tss = new_tss if new_tss is not None else tss
-                            wtemp = new_temp if new_temp is not None else wtemp
-                        else:
-                            status_filter = False
-                            print(f"[{current_date}] ⚠️ Gagal membaca data ISCAN.")
-                            
-                            
-                            
-                    # === LTNC ===
-                    if LTNC_STATUS.lower() == "active":
-                        ltnc_data = get_ltnc_data()
-                        if ltnc_data:
-                            new_depth, new_flow = ltnc_data
-                            depth = new_depth if new_depth is not None else depth
-                            flow = new_flow if new_flow is not None else flow
-                        else:
-                            status_filter = False
-                            print(f"[{current_date}] ⚠️ Gagal membaca data LTNC.")
-
-                    # === CONTLYTE ===
-                    if CONTLYTE_STATUS.lower() == "active":
-                        from contlyte import get_conlyte_data
-                        contlyte_data = get_conlyte_data()
-                        if contlyte_data:
-                            new_ph, new_tss, new_cod, new_temp = contlyte_data
-                            # Update global variables only if new data is not None
-                            ph = new_ph if new_ph is not None else ph
-                            tss = new_tss if new_tss is not None else tss
-                            cod = new_cod if new_cod is not None else cod
-                            wtemp = new_temp if new_temp is not None else wtemp
-                        else:
-                            status_filter = False
-                            print(f"[{current_date}] ⚠️ Gagal membaca data CONTLYTE.")
-                    
-                    # === GPIO Sensors ARG314 ===
-                    if ARG314_STATUS.lower() == "active":
-                        time.sleep(4)   #jika GPIO aktif delay 4 detik agar tidak bentrok saat pengambilan data
-                        data = get_sensor_gpio(current_date,"rain_sensor")
-                        # Update global variable only if new data is not None
-                        rain = data if data is not None else rain
-                        
-                    
-                    # Save data if all active sensors were read successfully
-                    if status_filter:
-                        # Check if any sensor is active
-                        if all(status.lower() != "active" for status in [AT500_STATUS, MACE_STATUS, SPECTRO_STATUS, SEM5096_STATUS, RT200_STATUS, ISCAN_STATUS, LTNC_STATUS, CONTLYTE_STATUS, ARG314_STATUS]):
-                            print(f"[{current_date}] ⚠️ Semua modul sensor tidak aktif. Melewati penyimpanan data.")
-                        else:
-                            print(f"[{current_date}] ✅ Semua data sensor berhasil terbaca.")
-                            print("\n=== SENSOR DATA ===")
-                            print(f"→ pH: {ph}, ORP: {orp}, TDS: {tds}, Conductivity: {conduct}, DO: {do}, Salinity: {salinity}, NH3-N: {nh3n}")
-                            print(f"→ Battery: {battery}, Depth: {depth}, Flow: {flow}, TFlow: {tflow}")
-                            print(f"→ Turbidity: {turb}, TSS: {tss}, COD: {cod}, BOD: {bod}, NO3: {no3}, atemp: {atemp}, wtemp: {wtemp}")
-                            print(f"→ apress: {apress} wpress: {wpress} Hum: {hum}, WSpeed: {wspeed}, WDir: {wdir}, Rain: {rain}, SRad: {srad}")
-                            print("===================  \n")
-                            
-                            insert_data(
-                                current_date,
-                                current_datetime,
-                                ph, orp, tds, conduct, do, salinity, nh3n,
-                                battery, depth, flow, tflow,
-                                turb, tss, cod, bod, no3, atemp, wtemp,
-                                apress,wpress, hum, wspeed, wdir, rain, srad
-                            ) 
-                    else:
-                        print(f"[{current_date}] ❌ Tidak semua sensor berhasil terbaca. Data tidak disimpan.")
-                    
-                    last_run = now.replace(second=0, microsecond=0)
-            
-            time.sleep(0.5)
+            current_date = tick.strftime("%Y-%m-%d %H:%M:%S")
+            current_datetime = epoch_seconds(tick)
+            print(f"\n[{current_date}] 📡 Membaca semua sensor...")
+            cycle_start = time.perf_counter()
+
+            status_filter = True
+
+            # Baca semua sensor aktif, paralel per bus, dengan batas waktu siklus
+            with metrics.timer("acquire"):
+                sensor_data, timed_out = read_all_sensors(budget, exclude=oversampler.names if oversampler else ())
+
+            # Sensor oversampling: nilai = agregat jendela sejak batas interval sebelumnya
+            stats = {}
+            if oversampler:
+                for name in oversampler.names:
+                    sensor_data[name], sensor_stats = oversampler.collect(name)
+                    for field, field_stats in sensor_stats.items():
+                        stats.setdefault(field, field_stats)
+            quality = field_quality(sensor_data, timed_out)
+
+            # === AT500 ===
+            if AT500_STATUS.lower() == "active":
+                at500_data = sensor_data.get("AT500")
+                if at500_data:
+                    new_ph, new_orp, new_tds, new_conduct, new_do, new_salinity, new_nh3n = at500_data
+                    # Update global variables only if new data is not None
+                    ph = new_ph if new_ph is not None else ph
+                    orp = new_orp if new_orp is not None else orp
+                    tds = new_tds if new_tds is not None else tds
+                    conduct = new_conduct if new_conduct is not None else conduct
+                    do = new_do if new_do is not None else do
+                    salinity = new_salinity if new_salinity is not None else salinity
+                    nh3n = new_nh3n if new_nh3n is not None else nh3n
+                else:
+                    status_filter = False
+                    print(f"[{current_date}] ⚠️ Gagal membaca data AT500.")
+
+            # === RT200 ===
+            if RT200_STATUS.lower() == "active":
+                rt200_data = sensor_data.get("RT200")
+                if rt200_data:
+                    new_temp, new_press, new_depth = rt200_data
+                    # Update global variables only if new data is not None
+                    wtemp = new_temp if new_temp is not None else wtemp
+                    wpress = new_press if new_press is not None else wpress
+                    depth = new_depth if new_depth is not None else depth
+                else:
+                    status_filter = False
+                    print(f"[{current_date}] ⚠️ Gagal membaca data RT200.")
+
+            # === SEM5096 ===
+            if SEM5096_STATUS.lower() == "active":
+                sem5096_data = sensor_data.get("SEM5096")
+                if sem5096_data:
+                    new_temp, new_hum, new_press, new_wspeed, new_wdir, new_rain, new_srad = sem5096_data
+                    # Update global variables only if new data is not None
+                    atemp = new_temp if new_temp is not None else atemp
+                    hum = new_hum if new_hum is not None else hum
+                    apress = new_press if new_press is not None else apress
+                    wspeed = new_wspeed if new_wspeed is not None else wspeed
+                    wdir = new_wdir if new_wdir is not None else wdir
+                    rain = new_rain if new_rain is not None else rain
+                    srad = new_srad if new_srad is not None else srad
+                else:
+                    status_filter = False
+                    print(f"[{current_date}] ⚠️ Gagal membaca data SEM5096.")
+
+
+            # === MACE ===
+            if MACE_STATUS.lower() == "active":
+                mace_data = sensor_data.get("MACE")
+                if mace_data:
+                    new_battery, new_depth, new_flow, new_tflow = mace_data
+                    # Update global variables only if new data is not None
+                    battery = new_battery if new_battery is not None else battery
+                    depth = new_depth if new_depth is not None else depth
+                    flow = new_flow if new_flow is not None else flow
+                    tflow = new_tflow if new_tflow is not None else tflow
+                else:
+                    status_filter = False
+                    print(f"[{current_date}] ⚠️ Gagal membaca data MACE.")
+
+            # === SPECTRO ===
+            if SPECTRO_STATUS.lower() == "active":
+                modbus_data = sensor_data.get("SPECTRO")
+                if modbus_data:
+                    new_turb, new_tss, new_cod, new_bod, new_no3, new_temp = modbus_data
+                    # Update global variables only if new data is not None
+                    turb = new_turb if new_turb is not None else turb
+                    tss = new_tss if new_tss is not None else tss
+                    cod = new_cod if new_cod is not None else cod
+                    bod = new_bod if new_bod is not None else bod
+                    no3 = new_no3 if new_no3 is not None else no3
+                    wtemp = new_temp if new_temp is not None else wtemp
+                else:
+                    status_filter = False
+                    print(f"[{current_date}] ⚠️ Gagal membaca data Modbus TCP.")
+
+            # === ISCAN ===
+            if ISCAN_STATUS.lower() == "active":
+                iscan_data = sensor_data.get("ISCAN")
+                if iscan_data:
+                    new_cod, new_tss, new_temp = iscan_data
+                    # Update global variables only if new data is not None
+                    cod = new_cod if new_cod is not None else cod
+                    tss = new_tss if new_tss is not None else tss
+                    wtemp = new_temp if new_temp is not None else wtemp
+                else:
+                    status_filter = False
+                    print(f"[{current_date}] ⚠️ Gagal membaca data ISCAN.")
+
+
+
+            # === LTNC ===
+            if LTNC_STATUS.lower() == "active":
+                ltnc_data = sensor_data.get("LTNC")
+                if ltnc_data:
+                    new_depth, new_flow = ltnc_data
+                    depth = new_depth if new_depth is not None else depth
+                    flow = new_flow if new_flow is not None else flow
+                else:
+                    status_filter = False
+                    print(f"[{current_date}] ⚠️ Gagal membaca data LTNC.")
+
+            # === CONTLYTE ===
+            if CONTLYTE_STATUS.lower() == "active":
+                contlyte_data = sensor_data.get("CONTLYTE")
+                if contlyte_data:
+                    new_ph, new_tss, new_cod, new_temp = contlyte_data
+                    # Update global variables only if new data is not None
+                    ph = new_ph if new_ph is not None else ph
+                    tss = new_tss if new_tss is not None else tss
+                    cod = new_cod if new_cod is not None else cod
+                    wtemp = new_temp if new_temp is not None else wtemp
+                else:
+                    status_filter = False
+                    print(f"[{current_date}] ⚠️ Gagal membaca data CONTLYTE.")
+
+            # === GPIO Sensors ARG314 ===
+            if ARG314_STATUS.lower() == "active":
+                # Total interval dikirim arg314.py lewat socket; SQLite hanya cadangan saat main.py tidak berjalan
+                data = gpio_receiver.take("rain_sensor", current_date, timeout=GPIO_WAIT)
+                if data is not None:
+                    print(f"[GPIO] ✅ Data sensor 'rain_sensor' untuk {current_date}: {data}")
+                else:
+                    data = get_sensor_gpio(current_date, "rain_sensor")
+                # Update global variable only if new data is not None
+                rain = data if data is not None else rain
+                # Intensitas puncak curah hujan (mm/jam) per jendela geser 1/5/10 menit
+                peaks = {}
+                for minutes in (1, 5, 10):
+                    value = gpio_receiver.take(f"rain_peak_{minutes}m", current_date)
+                    if value is not None:
+                        peaks[f"peak_{minutes}m"] = value
+                if peaks:
+                    stats["rain"] = {**stats.get("rain", {}), **peaks}
+                if data is not None:
+                    quality["rain"] = "ok"
+                else:
+                    quality.setdefault("rain", "missing")
+
+
+            # Simpan data yang berhasil terbaca; field yang gagal ditandai di kolom quality
+            if all(status.lower() != "active" for status in [AT500_STATUS, MACE_STATUS, SPECTRO_STATUS, SEM5096_STATUS, RT200_STATUS, ISCAN_STATUS, LTNC_STATUS, CONTLYTE_STATUS, ARG314_STATUS]):
+                print(f"[{current_date}] ⚠️ Semua modul sensor tidak aktif. Melewati penyimpanan data.")
+            elif "ok" not in quality.values():
+                print(f"[{current_date}] ❌ Tidak ada sensor yang berhasil terbaca. Data tidak disimpan.")
+            else:
+                if status_filter:
+                    print(f"[{current_date}] ✅ Semua data sensor berhasil terbaca.")
+                else:
+                    failed = sorted(field for field, flag in quality.items() if flag != "ok")
+                    print(f"[{current_date}] ⚠️ Sebagian sensor gagal terbaca, data parsial disimpan. Field kosong: {', '.join(failed)}")
+                print("\n=== SENSOR DATA ===")
+                print(f"→ pH: {ph}, ORP: {orp}, TDS: {tds}, Conductivity: {conduct}, DO: {do}, Salinity: {salinity}, NH3-N: {nh3n}")
+                print(f"→ Battery: {battery}, Depth: {depth}, Flow: {flow}, TFlow: {tflow}")
+                print(f"→ Turbidity: {turb}, TSS: {tss}, COD: {cod}, BOD: {bod}, NO3: {no3}, atemp: {atemp}, wtemp: {wtemp}")
+                print(f"→ apress: {apress} wpress: {wpress} Hum: {hum}, WSpeed: {wspeed}, WDir: {wdir}, Rain: {rain}, SRad: {srad}")
+                print("===================  \n")
+
+                insert_data(
+                    current_date,
+                    current_datetime,
+                    ph, orp, tds, conduct, do, salinity, nh3n,
+                    battery, depth, flow, tflow,
+                    turb, tss, cod, bod, no3, atemp, wtemp,
+                    apress,wpress, hum, wspeed, wdir, rain, srad,
+                    quality=quality,
+                    stats=stats
+                )
+
+            metrics.observe("cycle", seconds=time.perf_counter() - cycle_start)
+            metrics.count("cycles")
+            metrics.maybe_dump()
     
     except KeyboardInterrupt:
-        print(f"\n[{current_date}] 🛑 Service dihentikan secara manual.")
+        flush_writes()
+        metrics.dump()
+        if gpio_receiver:
+            gpio_receiver.close()
+        print(f"\n[{current_date}] 🛑 Service dihentikan.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
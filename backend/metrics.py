@@ -0,0 +1,120 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Batas atas bucket histogram latency (milidetik); bucket terakhir menampung sisanya
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_started = datetime.now()
+_last_dump = time.monotonic()
+
+
+class Histogram:
+    """Histogram latency dengan bucket tetap; hanya menyimpan jumlah, total dan maksimum."""
+
+    __slots__ = ("counts", "n", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.n = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.n += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, q):
+        """Perkiraan persentil dari batas atas bucket."""
+        target = q / 100 * self.n
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max
+        return 0
+
+    def to_dict(self):
+        return {
+            "n": self.n,
+            "mean": round(self.total / self.n, 2) if self.n else 0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": round(self.max, 2),
+            "buckets": self.counts,
+        }
+
+
+def _key(parts):
+    return "/".join(str(part) for part in parts)
+
+
+def count(*key, n=1):
+    """Menambah counter, mis. count("crc", "AT500")."""
+    key = _key(key)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + n
+
+
+def observe(*key, seconds):
+    """Mencatat satu durasi (detik) ke histogram, mis. observe("sensor", "AT500", seconds=0.12)."""
+    key = _key(key)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram()
+        histogram.observe(seconds * 1000)
+
+
+@contextmanager
+def timer(*key):
+    """Context manager pengukur durasi blok kode, mis. `with timer("cycle"): ...`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(*key, seconds=time.perf_counter() - start)
+
+
+def snapshot():
+    """Salinan semua metrik dalam bentuk dict (latency dalam milidetik)."""
+    with _lock:
+        return {
+            "started": _started.strftime("%Y-%m-%d %H:%M:%S"),
+            "updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "buckets_ms": BUCKETS_MS,
+            "counters": dict(_counters),
+            "latency_ms": {key: histogram.to_dict() for key, histogram in _histograms.items()},
+        }
+
+
+def dump(path=None):
+    """Menulis metrik ke file JSON ringkas (atomic: tulis file sementara lalu rename)."""
+    global _last_dump
+    path = path or os.getenv("METRICS_PATH", "/opt/logix/logs/metrics.json")
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot(), f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[METRICS] Gagal menulis metrik ke {path}: {e}")
+    _last_dump = time.monotonic()
+
+
+def maybe_dump():
+    """Dump metrik jika sudah lewat METRICS_INTERVAL detik sejak dump terakhir."""
+    if time.monotonic() - _last_dump >= int(os.getenv("METRICS_INTERVAL", "300")):
+        dump()
+
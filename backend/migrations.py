@@ -0,0 +1,179 @@
+import os
+from datetime import date, datetime
+
+import partitions
+import rollup
+import latest
+import storage
+
+# =============================
+# Migrasi skema tabel data / tmp
+# =============================
+# Setiap migrasi: (versi, keterangan, fungsi(cursor)). Migrasi dijalankan
+# berurutan sekali saja; versi yang sudah diterapkan dicatat di schema_version.
+# Tabel data dan tmp harus selalu punya urutan kolom yang sama karena
+# klhk/send.py dan retry.py memakai `INSERT INTO data SELECT * FROM tmp`.
+
+TABLES = ("data", "tmp")
+
+
+def ensure_column(cursor, table, column, definition):
+    """Menambahkan kolom di akhir tabel jika belum ada."""
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+        (table, column)
+    )
+    if cursor.fetchone()[0] == 0:
+        cursor.execute(f"ALTER TABLE `{table}` ADD COLUMN `{column}` {definition}")
+        print(f"[MIGRASI] Kolom {column} ditambahkan ke tabel {table}.")
+
+
+def ensure_index(cursor, table, name, columns):
+    """Membuat index jika belum ada (MySQL tidak punya CREATE INDEX IF NOT EXISTS)."""
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s",
+        (table, name)
+    )
+    if cursor.fetchone()[0] == 0:
+        cursor.execute(f"CREATE INDEX `{name}` ON `{table}` ({columns})")
+        print(f"[MIGRASI] Index {name} dibuat di tabel {table}.")
+
+
+def _quality_stats_columns(cursor):
+    for table in TABLES:
+        ensure_column(cursor, table, "quality", "TEXT")
+        ensure_column(cursor, table, "stats", "TEXT")
+
+
+def _varchar_device_status(cursor):
+    # TEXT tidak bisa di-index tanpa prefix; nilai device / status selalu pendek
+    for table in TABLES:
+        cursor.execute(f"ALTER TABLE `{table}` MODIFY COLUMN device VARCHAR(64), MODIFY COLUMN status VARCHAR(32)")
+
+
+# Index tabel data / tmp: (akhiran nama, kolom) -> idx_{table}_{akhiran}
+INDEXES = (
+    # /api/history, /api/export: filter / urut per date
+    ("date", "`date`"),
+    # klhk/send.py, retry.py: status IS NULL / status='retry' AND date < ...
+    ("status_date", "status, `date`"),
+    # hasSend.py: has = 0 AND datetime <= ...
+    ("has_datetime", "has, datetime"),
+    ("device", "device"),
+)
+
+
+def _query_indexes(cursor):
+    for table in TABLES:
+        for suffix, columns in INDEXES:
+            ensure_index(cursor, table, f"idx_{table}_{suffix}", columns)
+
+
+def _partition_data(cursor):
+    # Kolom partisi wajib ada di setiap unique key (termasuk primary key) dan harus NOT NULL
+    if partitions.is_partitioned(cursor):
+        return
+    cursor.execute("UPDATE data SET `date` = FROM_UNIXTIME(datetime) WHERE `date` IS NULL AND datetime > 0")
+    cursor.execute("UPDATE data SET `date` = '1970-01-01 00:00:00' WHERE `date` IS NULL")
+    cursor.execute("ALTER TABLE data MODIFY COLUMN `date` DATETIME NOT NULL, DROP PRIMARY KEY, ADD PRIMARY KEY (id, `date`)")
+
+    cursor.execute("SELECT MIN(`date`) FROM data WHERE `date` > '1970-01-01'")
+    first = cursor.fetchone()[0] or date.today()
+    partitions.partition_table(cursor, first, int(os.getenv('PARTITION_AHEAD', '3')))
+
+
+def _rollup_tables(cursor):
+    # Riwayat 3d / 7d / 30d / 1y dibaca dari rollup: isi dari data yang sudah ada
+    rollup.create_tables(cursor)
+    rollup.seed(cursor)
+
+
+def _latest_tables(cursor):
+    latest.create_tables(cursor)
+    latest.seed(cursor)
+
+
+MIGRATIONS = [
+    (1, "kolom quality dan stats", _quality_stats_columns),
+    (2, "device dan status menjadi VARCHAR", _varchar_device_status),
+    (3, "index date, (status, date), (has, datetime), device", _query_indexes),
+    (4, "partisi bulanan tabel data", _partition_data),
+    (5, "tabel rollup_hour dan rollup_day", _rollup_tables),
+    (6, "tabel latest dan latest_value", _latest_tables),
+]
+
+
+def current_version(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INT PRIMARY KEY,
+            description VARCHAR(255),
+            applied_at DATETIME
+        )
+    ''')
+    cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    return cursor.fetchone()[0]
+
+
+def migrate(conn):
+    """
+    Menerapkan semua migrasi yang belum tercatat di schema_version.
+    Return versi skema setelah migrasi. Migrasi yang gagal menghentikan proses
+    (versi berikutnya tidak dijalankan) dan dicoba lagi saat start berikutnya.
+    """
+    cursor = conn.cursor()
+    try:
+        version = current_version(cursor)
+        if storage.is_sqlite():
+            return _sqlite_schema(conn, cursor, version)
+        for number, description, apply in MIGRATIONS:
+            if number <= version:
+                continue
+            print(f"[MIGRASI] ▶️ Versi {number}: {description}")
+            apply(cursor)
+            cursor.execute(
+                "INSERT INTO schema_version (version, description, applied_at) VALUES (%s, %s, %s)",
+                (number, description, datetime.now())
+            )
+            conn.commit()
+            version = number
+        return version
+    finally:
+        cursor.close()
+
+
+def _sqlite_schema(conn, cursor, version):
+    """
+    SQLite: tabel data / tmp sudah dibuat cekTable() dengan kolom terbaru dan
+    tidak memakai partisi, sehingga cukup index serta tabel rollup / latest
+    lalu versi dicatat sebagai versi terakhir.
+    """
+    latest_version, description, _ = MIGRATIONS[-1]
+    if version >= latest_version:
+        return version
+    for table in TABLES:
+        for suffix, columns in INDEXES:
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{suffix} ON {table} ({columns})")
+    rollup.create_tables(cursor)
+    latest.create_tables(cursor)
+    cursor.execute(
+        "INSERT INTO schema_version (version, description, applied_at) VALUES (%s, %s, %s)",
+        (latest_version, f"skema SQLite ({description})", datetime.now())
+    )
+    conn.commit()
+    print(f"[MIGRASI] ✅ Skema SQLite siap (versi {latest_version}).")
+    return latest_version
+
+
+if __name__ == "__main__":
+    # Menjalankan migrasi secara manual: python migrations.py
+    import config
+    conn = config.get_connection()
+    try:
+        cursor = conn.cursor()
+        print(f"[MIGRASI] ✅ Versi skema saat ini: {current_version(cursor)}")
+        cursor.close()
+    finally:
+        conn.close()
@@ -0,0 +1,35 @@
+def _build_table():
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+        table.append(crc)
+    return tuple(table)
+
+
+# Tabel 256 entri CRC-16/Modbus (polinom terbalik 0xA001), dihitung sekali saat import
+CRC_TABLE = _build_table()
+
+
+def crc16(data):
+    """Menghitung CRC-16/Modbus (nilai awal 0xFFFF) dari bytes/bytearray."""
+    crc = 0xFFFF
+    table = CRC_TABLE
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+
+def append_crc(frame):
+    """Mengembalikan frame baru dengan CRC (little-endian) di akhir."""
+    frame = bytearray(frame)
+    frame += crc16(frame).to_bytes(2, byteorder='little')
+    return frame
+
+
+def check_crc(frame):
+    """True jika dua byte terakhir frame adalah CRC yang benar untuk isi frame."""
+    if len(frame) < 4:
+        return False
+    return crc16(frame[:-2]) == int.from_bytes(frame[-2:], byteorder='little')
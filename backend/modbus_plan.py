@@ -0,0 +1,55 @@
+import struct
+
+import numpy as np
+from numpy.lib import recfunctions
+
+# Jumlah register maksimum per request function 03/04 menurut spesifikasi Modbus
+MAX_COUNT = 125
+
+
+def plan_blocks(register_map, max_gap=32, max_count=MAX_COUNT):
+    """
+    Menggabungkan alamat register yang berdekatan menjadi sesedikit mungkin
+    request baca blok.
+
+    Argumen:
+        register_map (dict): nama parameter -> (alamat register, format big-endian), mis. {'ph': (0x15BA, '>f')}
+        max_gap (int): jarak kosong maksimum (dalam register) antar parameter dalam satu blok
+        max_count (int): jumlah register maksimum per request
+
+    Return:
+        list[dict]: blok dengan kunci 'start', 'count', 'fields' berisi (nama, offset byte, format)
+        dan 'dtype' numpy terstruktur untuk mendekode seluruh blok sekaligus
+    """
+    blocks = []
+    for name, (address, fmt) in sorted(register_map.items(), key=lambda item: item[1][0]):
+        size = struct.calcsize(fmt) // 2
+        block = blocks[-1] if blocks else None
+
+        if (block is not None
+                and address - (block['start'] + block['count']) <= max_gap
+                and address + size - block['start'] <= max_count):
+            block['count'] = max(block['count'], address + size - block['start'])
+        else:
+            block = {'start': address, 'count': size, 'fields': []}
+            blocks.append(block)
+
+        block['fields'].append((name, (address - block['start']) * 2, fmt))
+
+    for block in blocks:
+        block['dtype'] = np.dtype({
+            'names': [name for name, _, _ in block['fields']],
+            'formats': [fmt for _, _, fmt in block['fields']],
+            'offsets': [offset for _, offset, _ in block['fields']],
+            'itemsize': block['count'] * 2,
+        })
+    return blocks
+
+
+def decode_block(block, payload):
+    """
+    Mendekode semua parameter satu blok sekaligus dari buffer data respons
+    (tanpa header dan CRC). Return array float64 sesuai urutan block['fields'].
+    """
+    record = np.frombuffer(payload, dtype=block['dtype'], count=1)
+    return recfunctions.structured_to_unstructured(record, dtype=np.float64)[0]
@@ -0,0 +1,131 @@
+import time
+
+import metrics
+import modbus_crc
+
+# Waktu akhir frame terakhir per port (time.monotonic), untuk menjaga jeda diam t3.5
+_last_activity = {}
+
+# Kode exception untuk alamat / jumlah register yang tidak dikenal sensor
+ILLEGAL_ADDRESS_CODES = (0x02, 0x03)
+
+
+class IllegalAddressError(Exception):
+    """Sensor menolak rentang register yang diminta (exception 0x02 / 0x03)."""
+
+    def __init__(self, code):
+        super().__init__(f"exception 0x{code:02X} (alamat register tidak valid)")
+        self.code = code
+
+
+def silent_interval(baudrate):
+    """
+    Jeda diam 3.5 karakter (t3.5) antar frame Modbus RTU.
+    Satu karakter = 11 bit; di atas 19200 baud spesifikasi memakai nilai tetap 1.75 ms.
+    """
+    if baudrate > 19200:
+        return 0.00175
+    return 3.5 * 11 / baudrate
+
+
+def read_request(slave_id, function_code, address, count):
+    """Membuat frame request baca register/coil lengkap dengan CRC (little-endian)."""
+    frame = bytearray([slave_id, function_code])
+    frame += address.to_bytes(2, byteorder='big')
+    frame += count.to_bytes(2, byteorder='big')
+    return modbus_crc.append_crc(frame)
+
+
+def expected_length(function_code, count):
+    """
+    Panjang respons (termasuk CRC) yang diharapkan untuk function code dan
+    jumlah register/coil pada request. Frame exception selalu 5 byte.
+    """
+    if function_code & 0x80:
+        return 5
+    if function_code in (0x03, 0x04):
+        return 5 + 2 * count
+    if function_code in (0x01, 0x02):
+        return 5 + (count + 7) // 8
+    if function_code in (0x05, 0x06, 0x0F, 0x10):
+        return 8
+    return None
+
+
+def transaction(ser, frame, label=None):
+    """
+    Mengirim satu frame request RTU (sudah termasuk CRC) dan membaca respons
+    dengan panjang yang pasti, sehingga fungsi kembali begitu frame lengkap
+    diterima, tanpa menunggu timeout port.
+
+    Return: bytes respons lengkap, atau None jika tidak ada respons, respons
+    tidak lengkap, CRC salah, atau sensor membalas dengan frame exception.
+    Exception 0x02 / 0x03 dinaikkan sebagai IllegalAddressError karena
+    mengulang request yang sama tidak akan berhasil.
+    Kegagalan dihitung di metrics per `label` (default nama port).
+    """
+    port = ser.port
+    label = label or port
+    function_code = frame[1]
+    count = int.from_bytes(frame[4:6], byteorder='big')
+    length = expected_length(function_code, count)
+
+    # Pastikan bus sudah diam minimal t3.5 sejak frame terakhir
+    idle = time.monotonic() - _last_activity.get(port, 0)
+    t35 = silent_interval(ser.baudrate)
+    if idle < t35:
+        time.sleep(t35 - idle)
+
+    ser.reset_input_buffer()  # Buang sisa respons lama di buffer
+    ser.write(frame)
+    ser.flush()
+
+    try:
+        # Alamat slave, function code, lalu byte count / kode exception
+        header = ser.read(3)
+        if not header:
+            print(f"[MODBUS] Tidak ada respons dari {port} (slave {frame[0]}).")
+            metrics.count("timeout", label)
+            return None
+        if len(header) < 3:
+            print(f"[MODBUS] Respons tidak lengkap dari {port}: {header.hex()}")
+            metrics.count("incomplete", label)
+            return None
+
+        if header[1] & 0x80:
+            header += ser.read(2)
+            if not modbus_crc.check_crc(header):
+                print(f"[MODBUS] CRC salah pada frame exception dari {port}: {header.hex()}")
+                metrics.count("crc", label)
+                return None
+            print(f"[MODBUS] Exception dari slave {header[0]} di {port}: "
+                  f"function 0x{header[1] & 0x7F:02X}, kode 0x{header[2]:02X}")
+            metrics.count("exception", label)
+            if header[2] in ILLEGAL_ADDRESS_CODES:
+                raise IllegalAddressError(header[2])
+            return None
+
+        if header[0] != frame[0] or header[1] != function_code:
+            print(f"[MODBUS] Respons tidak cocok dari {port}: {header.hex()}")
+            metrics.count("mismatch", label)
+            return None
+
+        if function_code in (0x01, 0x02, 0x03, 0x04) and header[2] != length - 5:
+            # Byte count tidak sesuai request; habiskan frame agar bus bersih lalu tolak
+            ser.read(header[2] + 2)
+            print(f"[MODBUS] Byte count {header[2]} dari {port} tidak sesuai (harap {length - 5}).")
+            metrics.count("mismatch", label)
+            return None
+
+        response = header + ser.read(length - 3)
+        if len(response) < length:
+            print(f"[MODBUS] Respons tidak lengkap dari {port}: {response.hex()}")
+            metrics.count("incomplete", label)
+            return None
+        if not modbus_crc.check_crc(response):
+            print(f"[MODBUS] CRC salah dari {port}, frame ditolak: {response.hex()}")
+            metrics.count("crc", label)
+            return None
+        return response
+    finally:
+        _last_activity[port] = time.monotonic()
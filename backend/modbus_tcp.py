@@ -0,0 +1,70 @@
+import struct
+
+import metrics
+from modbus_rtu import ILLEGAL_ADDRESS_CODES, IllegalAddressError
+
+
+def read_request(transaction_id, unit_id, function_code, address, count):
+    """Membuat frame request Modbus TCP (header MBAP + PDU baca register)."""
+    header = struct.pack('>HHHB', transaction_id & 0xFFFF, 0x0000, 6, unit_id)
+    body = struct.pack('>BHH', function_code, address, count)
+    return header + body
+
+
+def recv_exact(sock, length):
+    """Membaca tepat sejumlah byte dari socket (recv bisa mengembalikan potongan)."""
+    data = b''
+    while len(data) < length:
+        chunk = sock.recv(length - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def transaction(sock, frame, label=None):
+    """
+    Mengirim satu request Modbus TCP dan membaca respons sesuai panjang di header MBAP.
+    Return: bytes data register (tanpa header), atau None jika respons tidak valid
+    atau tidak datang sebelum timeout socket.
+    Exception 0x02 / 0x03 dinaikkan sebagai IllegalAddressError.
+    """
+    label = label or "tcp"
+    sock.sendall(frame)
+
+    try:
+        mbap = recv_exact(sock, 7)
+        if len(mbap) < 7:
+            print("[MODBUS] Response TCP tidak valid.")
+            metrics.count("incomplete", label)
+            return None
+        transaction_id, _, remaining, _ = struct.unpack('>HHHB', mbap)
+        # remaining = unit id + PDU; tetap dibaca walau terlalu pendek agar stream tidak bergeser
+        response = mbap + recv_exact(sock, max(remaining - 1, 0))
+    except TimeoutError:
+        # Frame hilang: dikembalikan None agar pemanggil bisa mengulang seperti RTU
+        print("[MODBUS] Tidak ada respons TCP sebelum timeout.")
+        metrics.count("timeout", label)
+        return None
+
+    if remaining < 3 or len(response) < 9:
+        print(f"[MODBUS] Response TCP terlalu pendek: {response.hex()}")
+        metrics.count("mismatch", label)
+        return None
+
+    function_code = frame[7]
+    count = int.from_bytes(frame[10:12], byteorder='big')
+    if response[7] & 0x80:
+        print(f"[MODBUS] Exception TCP: function 0x{function_code:02X}, kode 0x{response[8]:02X}")
+        metrics.count("exception", label)
+        if response[8] in ILLEGAL_ADDRESS_CODES:
+            raise IllegalAddressError(response[8])
+        return None
+    if (transaction_id != int.from_bytes(frame[0:2], byteorder='big')
+            or response[7] != function_code
+            or len(response) < 9 + 2 * count):
+        print("[MODBUS] Response TCP tidak valid.")
+        metrics.count("mismatch", label)
+        return None
+
+    return response[9:9 + 2 * count]
@@ -0,0 +1,134 @@
+import math
+import threading
+import time
+
+import numpy as np
+
+from sensor_engine import read_sensor, set_deadline
+from sensor_maps import SENSOR_MAPS
+
+# Field arah (derajat): rata-rata dihitung secara vektor, bukan aritmetika
+CIRCULAR_FIELDS = {'wdir'}
+# Field totalizer / akumulasi: yang disimpan adalah sampel terakhir, bukan rata-rata
+LAST_FIELDS = {'tflow'}
+
+
+class RingBuffer:
+    """
+    Buffer melingkar numpy berukuran tetap (capacity x jumlah field).
+    Memori dialokasikan sekali; sampel tertua ditimpa saat buffer penuh.
+    Field yang gagal terbaca disimpan sebagai NaN.
+    """
+
+    def __init__(self, capacity, fields):
+        self.fields = tuple(fields)
+        self.data = np.full((capacity, len(self.fields)), np.nan)
+        self.index = 0
+        self.size = 0
+        self._lock = threading.Lock()
+
+    def append(self, values):
+        """values: dict nama field -> nilai (field yang tidak ada menjadi NaN)."""
+        row = [values.get(field) for field in self.fields]
+        with self._lock:
+            self.data[self.index] = [np.nan if value is None else value for value in row]
+            self.index = (self.index + 1) % len(self.data)
+            self.size = min(self.size + 1, len(self.data))
+
+    def drain(self):
+        """Mengambil salinan semua sampel di jendela saat ini lalu mengosongkan buffer."""
+        with self._lock:
+            if self.size < len(self.data):
+                window = self.data[:self.size].copy()
+            else:
+                # Buffer penuh: urutkan dari sampel tertua
+                window = np.roll(self.data, -self.index, axis=0).copy()
+            self.index = 0
+            self.size = 0
+        return window
+
+
+def window_stats(fields, window):
+    """
+    Statistik jendela per field: mean, min, max, std dan jumlah sampel valid.
+    Return (dict nilai representatif per field, dict statistik per field).
+    """
+    values, stats = {}, {}
+    valid = ~np.isnan(window)
+    for i, field in enumerate(fields):
+        column = window[valid[:, i], i]
+        if column.size == 0:
+            continue
+        if field in CIRCULAR_FIELDS:
+            radians = np.deg2rad(column)
+            value = math.degrees(math.atan2(np.sin(radians).mean(), np.cos(radians).mean())) % 360
+        elif field in LAST_FIELDS:
+            value = column[-1]
+        else:
+            value = column.mean()
+        values[field] = round(float(value), 2)
+        stats[field] = {
+            'mean': round(float(column.mean()), 2),
+            'min': round(float(column.min()), 2),
+            'max': round(float(column.max()), 2),
+            'std': round(float(column.std()), 3),
+            'n': int(column.size),
+        }
+    return values, stats
+
+
+class Oversampler:
+    """
+    Membaca sensor cepat setiap `period` detik di thread latar ke RingBuffer
+    masing-masing. Pada batas interval DELAY, main.py memanggil collect() untuk
+    mengambil nilai jendela (mean) dan statistiknya lalu buffer dikosongkan.
+    """
+
+    def __init__(self, names, period, window_seconds):
+        self.names = list(names)
+        self.period = period
+        # Cadangan 50% agar jendela yang sedikit molor tidak menimpa sampel awal
+        capacity = max(1, math.ceil(window_seconds / period * 1.5))
+        self.buffers = {name: RingBuffer(capacity, SENSOR_MAPS[name]['outputs']) for name in self.names}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="oversample")
+
+    def start(self):
+        print(f"[OVERSAMPLE] ▶️ Oversampling {', '.join(self.names)} setiap {self.period} detik.")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        next_run = time.monotonic()
+        while not self._stop.is_set():
+            # Satu putaran sampel harus selesai sebelum putaran berikutnya
+            set_deadline(next_run + self.period, thread_only=True)
+            for name in self.names:
+                try:
+                    values = read_sensor(name)
+                except Exception as e:
+                    print(f"[OVERSAMPLE] Gagal membaca {name}: {e}")
+                    continue
+                if values:
+                    self.buffers[name].append(values)
+
+            next_run += self.period
+            now = time.monotonic()
+            if next_run < now:
+                # Putaran terlalu lambat: lewati slot yang terlewat
+                next_run = now
+            self._stop.wait(next_run - now)
+
+    def collect(self, name):
+        """
+        Return (tuple sesuai urutan 'outputs' seperti get_*_data(), dict statistik),
+        atau (None, {}) jika tidak ada sampel valid dalam jendela.
+        """
+        buffer = self.buffers[name]
+        values, stats = window_stats(buffer.fields, buffer.drain())
+        if not values:
+            return None, {}
+        return tuple(values.get(field) for field in buffer.fields), stats
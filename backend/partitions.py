@@ -0,0 +1,113 @@
+from datetime import date, datetime
+
+import storage
+
+# =============================
+# Partisi bulanan tabel data
+# =============================
+# Tabel data dipartisi RANGE COLUMNS(`date`) per bulan: partisi pYYYYMM berisi
+# baris dengan date < tanggal 1 bulan berikutnya, ditambah partisi pmax
+# (MAXVALUE) sebagai penampung. Retensi menghapus partisi utuh (DROP PARTITION)
+# dan partisi bulan mendatang dibuat lebih dulu dengan memecah pmax.
+
+TABLE = "data"
+MAX_PARTITION = "pmax"
+
+
+def add_months(month, n):
+    """Tanggal 1 bulan ke-n setelah `month` (date/datetime)."""
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"p{month.year:04d}{month.month:02d}"
+
+
+def partition_clause(month):
+    """Definisi partisi untuk bulan `month`: berisi date < tanggal 1 bulan berikutnya."""
+    return f"PARTITION {partition_name(month)} VALUES LESS THAN ('{add_months(month, 1):%Y-%m-%d}')"
+
+
+def list_partitions(cursor, table=TABLE):
+    """
+    Return list (nama, batas atas) partisi urut posisi; batas atas berupa date,
+    atau None untuk pmax. List kosong jika tabel belum dipartisi (atau backend SQLite).
+    """
+    if storage.is_sqlite():
+        return []
+    cursor.execute(
+        "SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL "
+        "ORDER BY PARTITION_ORDINAL_POSITION",
+        (table,)
+    )
+    partitions = []
+    for name, description in cursor.fetchall():
+        bound = description.strip("'") if description else "MAXVALUE"
+        if bound.upper() == "MAXVALUE":
+            partitions.append((name, None))
+        else:
+            partitions.append((name, datetime.strptime(bound[:10], "%Y-%m-%d").date()))
+    return partitions
+
+
+def is_partitioned(cursor, table=TABLE):
+    return bool(list_partitions(cursor, table))
+
+
+def partition_table(cursor, first_month, months_ahead, table=TABLE):
+    """
+    Mengubah tabel biasa menjadi tabel berpartisi bulanan mulai `first_month`
+    sampai bulan ini + `months_ahead`. Partisi pertama juga menampung semua
+    baris yang lebih lama dari `first_month`.
+    """
+    last_month = add_months(date.today(), months_ahead)
+    month = date(first_month.year, first_month.month, 1)
+    clauses = []
+    while month <= last_month:
+        clauses.append(partition_clause(month))
+        month = add_months(month, 1)
+    clauses.append(f"PARTITION {MAX_PARTITION} VALUES LESS THAN (MAXVALUE)")
+    cursor.execute(f"ALTER TABLE `{table}` PARTITION BY RANGE COLUMNS(`date`) ({', '.join(clauses)})")
+    print(f"[PARTISI] Tabel {table} dipartisi per bulan: {len(clauses) - 1} partisi + {MAX_PARTITION}.")
+
+
+def ensure_future_partitions(cursor, months_ahead, table=TABLE):
+    """
+    Memastikan partisi sampai bulan ini + `months_ahead` sudah ada dengan memecah
+    pmax (murah selama pmax masih kosong). Return jumlah partisi yang dibuat.
+    """
+    partitions = list_partitions(cursor, table)
+    if not partitions:
+        return 0
+    bounds = [bound for _, bound in partitions if bound is not None]
+    month = bounds[-1] if bounds else date.today().replace(day=1)
+    last_month = add_months(date.today(), months_ahead)
+
+    clauses = []
+    while month <= last_month:
+        clauses.append(partition_clause(month))
+        month = add_months(month, 1)
+    if not clauses:
+        return 0
+
+    clauses.append(f"PARTITION {MAX_PARTITION} VALUES LESS THAN (MAXVALUE)")
+    cursor.execute(f"ALTER TABLE `{table}` REORGANIZE PARTITION {MAX_PARTITION} INTO ({', '.join(clauses)})")
+    print(f"[PARTISI] ➕ {len(clauses) - 1} partisi baru dibuat di tabel {table} (sampai {partition_name(add_months(month, -1))}).")
+    return len(clauses) - 1
+
+
+def drop_partitions_before(cursor, cutoff, table=TABLE):
+    """
+    Menghapus partisi yang seluruh isinya lebih lama dari `cutoff` (batas atas
+    <= cutoff). Partisi terakhir sebelum pmax tidak pernah dihapus.
+    Return list nama partisi yang dihapus.
+    """
+    cutoff = cutoff.date() if isinstance(cutoff, datetime) else cutoff
+    ranged = [(name, bound) for name, bound in list_partitions(cursor, table) if bound is not None]
+    expired = [name for name, bound in ranged[:-1] if bound <= cutoff]
+    if expired:
+        cursor.execute(f"ALTER TABLE `{table}` DROP PARTITION {', '.join(expired)}")
+        print(f"[PARTISI] 🗑️ Partisi dihapus dari tabel {table}: {', '.join(expired)}")
+    return expired
@@ -0,0 +1,232 @@
+import argparse
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import storage
+
+# =============================
+# Rollup per jam / per hari
+# =============================
+# Tabel rollup_hour dan rollup_day menyimpan agregat per (bucket, param):
+# jumlah sampel, total, min dan max, sehingga rata-rata = total / n dan
+# bucket bisa ditambah secara inkremental dengan ON DUPLICATE KEY UPDATE.
+# Untuk wdir, kolom u / v berisi jumlah vektor angin (wspeed * sin / cos arah)
+# sehingga arah rata-rata = atan2(u, v), bukan rata-rata aritmetika derajat.
+
+# Kolom numerik tabel data / tmp yang di-rollup (urutan sama dengan INSERT_QUERY)
+PARAMS = (
+    "ph", "orp", "tds", "conduct", "do", "salinity", "nh3n", "battery", "depth", "flow", "tflow",
+    "turb", "tss", "cod", "bod", "no3", "atemp", "wtemp", "apress", "wpress", "hum", "wspeed",
+    "wdir", "rain", "srad",
+)
+# Posisi kolom date dan parameter pertama pada tuple nilai INSERT_QUERY
+DATE_INDEX = 1
+FIRST_PARAM_INDEX = 3
+
+# Nama tabel -> lebar bucket (detik)
+LEVELS = {"rollup_hour": 3600, "rollup_day": 86400}
+
+UPSERT_QUERY = """
+    INSERT INTO {table} (bucket, param, n, total, vmin, vmax, u, v)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        n = n + VALUES(n),
+        total = total + VALUES(total),
+        vmin = LEAST(vmin, VALUES(vmin)),
+        vmax = GREATEST(vmax, VALUES(vmax)),
+        u = u + VALUES(u),
+        v = v + VALUES(v)
+"""
+
+UPSERT_QUERY_SQLITE = """
+    INSERT INTO {table} (bucket, param, n, total, vmin, vmax, u, v)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (bucket, param) DO UPDATE SET
+        n = n + excluded.n,
+        total = total + excluded.total,
+        vmin = min(vmin, excluded.vmin),
+        vmax = max(vmax, excluded.vmax),
+        u = u + excluded.u,
+        v = v + excluded.v
+"""
+
+
+def create_tables(cursor):
+    for table in LEVELS:
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                bucket DATETIME NOT NULL,
+                param VARCHAR(16) NOT NULL,
+                n INT NOT NULL DEFAULT 0,
+                total DOUBLE NOT NULL DEFAULT 0,
+                vmin FLOAT,
+                vmax FLOAT,
+                u DOUBLE NOT NULL DEFAULT 0,
+                v DOUBLE NOT NULL DEFAULT 0,
+                PRIMARY KEY (bucket, param)
+            )
+        ''')
+
+
+def as_datetime(date):
+    """datetime dari nilai kolom date (datetime, atau string 'YYYY-MM-DD HH:MM:SS' dari journal)."""
+    if isinstance(date, str):
+        return datetime.strptime(date[:19], "%Y-%m-%d %H:%M:%S")
+    return date
+
+
+def bucket_of(date, seconds):
+    """Awal bucket (jam / hari) untuk `date`."""
+    date = as_datetime(date)
+    if seconds >= 86400:
+        return date.replace(hour=0, minute=0, second=0, microsecond=0)
+    return date.replace(minute=0, second=0, microsecond=0)
+
+
+def aggregate(rows, seconds):
+    """
+    Agregat baris INSERT_QUERY per (bucket, param). Nilai None dilewati.
+    Return list tuple (bucket, param, n, total, vmin, vmax, u, v) siap di-upsert.
+    """
+    acc = defaultdict(lambda: [0, 0.0, math.inf, -math.inf, 0.0, 0.0])
+    wspeed_index = FIRST_PARAM_INDEX + PARAMS.index("wspeed")
+    for row in rows:
+        if row[DATE_INDEX] is None:
+            continue
+        bucket = bucket_of(row[DATE_INDEX], seconds)
+        for i, param in enumerate(PARAMS, FIRST_PARAM_INDEX):
+            value = row[i]
+            if value is None:
+                continue
+            value = float(value)
+            item = acc[(bucket, param)]
+            item[0] += 1
+            item[1] += value
+            item[2] = min(item[2], value)
+            item[3] = max(item[3], value)
+            if param == "wdir":
+                # Tanpa wspeed setiap arah diberi bobot 1
+                speed = row[wspeed_index]
+                weight = 1.0 if speed is None else float(speed)
+                item[4] += weight * math.sin(math.radians(value))
+                item[5] += weight * math.cos(math.radians(value))
+    return [(bucket, param, *item) for (bucket, param), item in acc.items()]
+
+
+def update(cursor, rows):
+    """Menambahkan baris INSERT_QUERY ke semua tabel rollup (dalam transaksi pemanggil)."""
+    query = UPSERT_QUERY_SQLITE if storage.is_sqlite() else UPSERT_QUERY
+    for table, seconds in LEVELS.items():
+        aggregates = aggregate(rows, seconds)
+        if aggregates:
+            cursor.executemany(query.format(table=table), aggregates)
+
+
+def pick_level(resolution):
+    """
+    Sumber paling kasar yang resolusinya masih <= `resolution` (detik):
+    nama tabel rollup, atau None untuk data mentah.
+    """
+    table = None
+    for name, seconds in sorted(LEVELS.items(), key=lambda item: item[1]):
+        if seconds <= resolution:
+            table = name
+    return table
+
+
+def query_series(cursor, table, param, start):
+    """
+    Deret rollup `param` sejak `start`.
+    Return list (bucket, avg, vmin, vmax, n); untuk wdir avg berupa arah vektor rata-rata.
+    """
+    cursor.execute(
+        f"SELECT bucket, n, total, vmin, vmax, u, v FROM {table} "
+        f"WHERE param = %s AND bucket >= %s ORDER BY bucket ASC",
+        (param, bucket_of(start, LEVELS[table]))
+    )
+    series = []
+    for bucket, n, total, vmin, vmax, u, v in cursor.fetchall():
+        if not n:
+            continue
+        if param == "wdir":
+            avg = math.degrees(math.atan2(u, v)) % 360
+        else:
+            avg = total / n
+        series.append((bucket, round(avg, 2), vmin, vmax, n))
+    return series
+
+
+def _rebuild_day(cursor, day):
+    """Menghitung ulang bucket satu hari dari data + tmp (tanpa commit). Return jumlah baris."""
+    next_day = day + timedelta(days=1)
+    columns = ", ".join(["NULL AS device", "`date`", "datetime"] + list(PARAMS))
+    for table in LEVELS:
+        cursor.execute(f"DELETE FROM {table} WHERE bucket >= %s AND bucket < %s", (day, next_day))
+    cursor.execute(
+        f"SELECT {columns} FROM data WHERE `date` >= %s AND `date` < %s "
+        f"UNION ALL SELECT {columns} FROM tmp WHERE `date` >= %s AND `date` < %s",
+        (day, next_day, day, next_day)
+    )
+    rows = cursor.fetchall()
+    update(cursor, rows)
+    return len(rows)
+
+
+def rebuild(conn, since, until=None):
+    """
+    Menghitung ulang rollup dari data + tmp untuk rentang [since, until), per
+    hari agar memori tetap kecil. Bucket di rentang tersebut dihapus dulu.
+    """
+    until = until or datetime.now()
+    day = since.replace(hour=0, minute=0, second=0, microsecond=0)
+    cursor = conn.cursor()
+    try:
+        create_tables(cursor)
+        while day < until:
+            count = _rebuild_day(cursor, day)
+            conn.commit()
+            print(f"[ROLLUP] {day:%Y-%m-%d}: {count} baris.")
+            day += timedelta(days=1)
+    finally:
+        cursor.close()
+
+
+def seed(cursor):
+    """
+    Mengisi rollup dari semua data + tmp yang sudah ada (sekali saat migrasi,
+    di transaksi migrasi). Baris dengan date pengganti 1970-01-01 dilewati.
+    """
+    first = None
+    for table in ("data", "tmp"):
+        cursor.execute(f"SELECT MIN(`date`) FROM {table} WHERE `date` > '1970-01-01'")
+        value = as_datetime(cursor.fetchone()[0])
+        if value is not None and (first is None or value < first):
+            first = value
+    if first is None:
+        return
+    day, until, total = bucket_of(first, 86400), datetime.now(), 0
+    while day < until:
+        total += _rebuild_day(cursor, day)
+        day += timedelta(days=1)
+    print(f"[ROLLUP] Rollup diisi dari {total} baris sejak {first:%Y-%m-%d}.")
+
+
+if __name__ == "__main__":
+    # Menghitung ulang rollup data lama: python rollup.py --since 2025-01-01
+    parser = argparse.ArgumentParser(description="Rebuild tabel rollup_hour / rollup_day")
+    parser.add_argument("--since", required=True, help="Tanggal awal (YYYY-MM-DD)")
+    parser.add_argument("--until", help="Tanggal akhir, eksklusif (YYYY-MM-DD, default: sekarang)")
+    args = parser.parse_args()
+
+    import config
+    conn = config.get_connection()
+    try:
+        rebuild(
+            conn,
+            datetime.strptime(args.since, "%Y-%m-%d"),
+            datetime.strptime(args.until, "%Y-%m-%d") if args.until else None
+        )
+        print("[ROLLUP] ✅ Rebuild selesai.")
+    finally:
+        conn.close()
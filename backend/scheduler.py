@@ -0,0 +1,91 @@
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+# Tidur maksimum per langkah; jam dinding dicek ulang agar koreksi NTP tetap terdeteksi
+MAX_SLEEP = 30
+
+
+class IntervalScheduler:
+    """
+    Penjadwal tick berbasis jam monotonic yang selaras dengan batas waktu jam dinding.
+
+    Interval <= 60 menit diselaraskan per jam (sama seperti `menit % DELAY == 0`),
+    interval lebih panjang diselaraskan per hari. offset_minutes menggeser tick,
+    mis. interval 60 dengan offset 10 berjalan setiap menit ke-10.
+
+    Pemakaian:
+        for tick in IntervalScheduler(DELAY):
+            ...  # tick = datetime batas interval yang sedang dijalankan
+    """
+
+    def __init__(self, interval_minutes, offset_minutes=0, catch_up=False, tz=None, name="SCHEDULER"):
+        self.interval = timedelta(minutes=interval_minutes)
+        self.offset = timedelta(minutes=offset_minutes)
+        self.catch_up = catch_up
+        self.tz = tz
+        self.name = name
+        self.missed_total = 0
+        self._pending = deque()
+        self.next_tick = self.next_boundary(self.now())
+
+    def now(self):
+        return datetime.now(self.tz) if self.tz else datetime.now()
+
+    def next_boundary(self, after):
+        """Batas interval pertama yang lebih besar dari `after`."""
+        if self.interval <= timedelta(hours=1):
+            span = timedelta(hours=1)
+            period = after.replace(minute=0, second=0, microsecond=0)
+        else:
+            span = timedelta(days=1)
+            period = after.replace(hour=0, minute=0, second=0, microsecond=0)
+
+        period -= span
+        while True:
+            tick = period + self.offset
+            while tick < period + self.offset + span:
+                if tick > after:
+                    return tick
+                tick += self.interval
+            period += span
+
+    def wait(self):
+        """Tidur sampai tick berikutnya lalu mengembalikan datetime tick tersebut."""
+        if self._pending:
+            return self._pending.popleft()
+
+        while True:
+            now = self.now()
+            remaining = (self.next_tick - now).total_seconds()
+            if remaining <= 0:
+                break
+            deadline = time.monotonic() + min(remaining, MAX_SLEEP)
+            while True:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    break
+                time.sleep(left)
+
+        tick = self.next_tick
+        missed = []
+        following = self.next_boundary(tick)
+        while following <= now:
+            missed.append(following)
+            following = self.next_boundary(following)
+        self.next_tick = following
+
+        if missed:
+            self.missed_total += len(missed)
+            print(f"[{self.name}] ⚠️ {len(missed)} tick terlewat setelah {tick.strftime('%Y-%m-%d %H:%M:%S')} "
+                  f"(total {self.missed_total}).")
+            if self.catch_up:
+                self._pending.extend(missed)
+            else:
+                # Lewati tick lama, langsung jalankan batas interval terbaru
+                tick = missed[-1]
+        return tick
+
+    def __iter__(self):
+        while True:
+            yield self.wait()
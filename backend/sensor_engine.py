@@ -0,0 +1,345 @@
+import os
+import socket
+import threading
+import time
+
+import numpy as np
+import serial
+
+from breaker import CircuitBreaker
+import metrics
+import modbus_plan
+import modbus_rtu
+import modbus_tcp
+import serial_pool
+from sensor_maps import SENSOR_MAPS
+
+# Jeda sebelum mengulang pembacaan blok yang gagal (detik)
+RETRY_DELAY = 0.5
+
+# Cache rencana blok per sensor (dihitung sekali per proses)
+_plans = {}
+
+# Circuit breaker per sensor
+_breakers = {}
+
+# Batas waktu siklus akuisisi yang sedang berjalan (time.monotonic), None = tanpa batas
+_deadline = None
+# Batas waktu khusus thread (mis. thread oversampling), menggantikan batas waktu siklus
+_local = threading.local()
+
+
+def set_deadline(deadline, thread_only=False):
+    """
+    Menetapkan batas waktu siklus; driver yang melewatinya berhenti di percobaan berikutnya.
+    thread_only=True hanya berlaku untuk thread pemanggil.
+    """
+    global _deadline
+    if thread_only:
+        _local.deadline = deadline
+    else:
+        _deadline = deadline
+
+
+def time_left():
+    """Sisa waktu siklus dalam detik (None jika tidak ada batas waktu)."""
+    deadline = getattr(_local, 'deadline', _deadline)
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def deadline_passed(name):
+    left = time_left()
+    if left is not None and left <= 0:
+        print(f"[DEADLINE] ⏰ Batas waktu siklus terlewati, pembacaan {name} dibatalkan.")
+        return True
+    return False
+
+
+def get_breaker(name):
+    """
+    Breaker sensor: open setelah BREAKER_THRESHOLD kegagalan berturut-turut,
+    lalu probe sekali per interval DELAY.
+    """
+    breaker = _breakers.get(name)
+    if breaker is None:
+        delay_seconds = int(os.getenv('DELAY', '1')) * 60
+        breaker = _breakers[name] = CircuitBreaker(
+            name,
+            threshold=int(os.getenv('BREAKER_THRESHOLD', '3')),
+            # Sedikit kurang dari satu interval agar probe jatuh di setiap siklus berikutnya
+            probe_interval=delay_seconds * 0.9
+        )
+    return breaker
+
+
+def _prepare(spec, blocks):
+    """Melengkapi blok dengan nama field, skala, offset dan frame request RTU."""
+    scaling = {field: (scale, offset) for field, _, _, scale, offset in spec['fields']}
+    for block in blocks:
+        names = [field for field, _, _ in block['fields']]
+        block['names'] = names
+        block['scale'] = np.array([scaling[field][0] for field in names], dtype=np.float64)
+        block['offset'] = np.array([scaling[field][1] for field in names], dtype=np.float64)
+        if spec['transport'] == 'rtu':
+            block['request'] = modbus_rtu.read_request(
+                spec['slave_id'], spec['function'], block['start'], block['count']
+            )
+    return blocks
+
+
+def get_plan(name):
+    """
+    Menyusun blok register satu sensor beserta request, skala dan offset yang
+    sudah dihitung, sehingga jalur baca hanya mengirim frame dan mendekode.
+    """
+    plan = _plans.get(name)
+    if plan is not None:
+        return plan
+
+    spec = SENSOR_MAPS[name]
+    register_map = {field: (address, fmt) for field, address, fmt, _, _ in spec['fields']}
+    plan = _prepare(spec, modbus_plan.plan_blocks(
+        register_map,
+        max_gap=int(spec.get('max_gap', os.getenv('MODBUS_BLOCK_GAP', '32'))),
+        max_count=int(spec.get('max_count', os.getenv('MODBUS_BLOCK_MAX', '125')))
+    ))
+    _plans[name] = plan
+    return plan
+
+
+def split_block(name, block):
+    """
+    Mengganti blok gabungan yang ditolak sensor (exception 0x02 / 0x03, biasanya
+    karena blok melewati register yang tidak dipetakan) dengan satu request per
+    field. Rencana sensor di cache ikut diganti sehingga siklus berikutnya
+    langsung membaca per field. Return list blok pengganti.
+    """
+    spec = SENSOR_MAPS[name]
+    register_map = {field: (address, fmt) for field, address, fmt, _, _ in spec['fields'] if field in block['names']}
+    # max_gap=-1: register yang bersebelahan pun tidak digabung
+    blocks = _prepare(spec, modbus_plan.plan_blocks(register_map, max_gap=-1))
+    plan = _plans.get(name, [])
+    index = next((i for i, item in enumerate(plan) if item is block), None)
+    if index is not None:
+        _plans[name] = plan[:index] + blocks + plan[index + 1:]
+    print(f"[MODBUS] ✂️ Blok 0x{block['start']:04X}x{block['count']} {name} ditolak sensor, "
+          f"dipecah menjadi {len(blocks)} request per field.")
+    metrics.count("split", name)
+    return blocks
+
+
+def decode(block, payload):
+    """Mendekode satu blok: raw * skala + offset untuk semua field sekaligus."""
+    values = np.round(modbus_plan.decode_block(block, payload) * block['scale'] + block['offset'], 2)
+    return dict(zip(block['names'], values.tolist()))
+
+
+def _read_rtu_block(name, spec, port, block, retries):
+    settings = {
+        'stopbits': serial.STOPBITS_ONE,
+        'bytesize': serial.EIGHTBITS,
+        'timeout': 1,
+    }
+    settings.update(spec['serial'])
+
+    for attempt in range(1, retries + 1):
+        if deadline_passed(name):
+            return None
+        if attempt > 1:
+            metrics.count("retry", name)
+        try:
+            with serial_pool.open_port(port, **settings) as ser:
+                with metrics.timer("register", name, f"0x{block['start']:04X}"):
+                    response = modbus_rtu.transaction(ser, block['request'], label=name)
+
+            if response is not None:
+                return response[3:-2]
+            print(f"Percobaan {attempt}/{retries}: No valid response {name} from {port}, retrying...")
+        except modbus_rtu.IllegalAddressError:
+            # Request yang sama pasti ditolak lagi: blok gabungan dipecah oleh pemanggil
+            if len(block['names']) > 1:
+                raise
+            print(f"[MODBUS] Register 0x{block['start']:04X} ({block['names'][0]}) ditolak {name}, field dilewati.")
+            return None
+        except Exception as e:
+            print(f"Percobaan {attempt}/{retries}: Error reading Modbus {name}: {e}, retrying...")
+
+        if attempt < retries:
+            time.sleep(RETRY_DELAY)  # Tunggu sebelum mencoba lagi
+
+    print(f"Gagal membaca blok 0x{block['start']:04X} {name} dari {port} setelah {retries} percobaan.")
+    return None
+
+
+def _read_rtu(name, spec, plan, retries):
+    port = os.getenv(spec['port_env'])
+    if not port or not os.path.exists(port):
+        print(f"[ERROR] Port {port} tidak tersedia. Membatalkan pembacaan {name}.")
+        return None
+
+    values = {}
+    pending = list(plan)
+    while pending:
+        block = pending.pop(0)
+        if deadline_passed(name):
+            break
+        try:
+            payload = _read_rtu_block(name, spec, port, block, retries)
+        except modbus_rtu.IllegalAddressError:
+            pending[:0] = split_block(name, block)
+            continue
+        if payload is not None:
+            values.update(decode(block, payload))
+        elif not values and retries == 1 and len(plan) > 1:
+            # Probe / sensor bermasalah gagal di blok pertama: jangan habiskan waktu untuk blok lain
+            break
+    return values
+
+
+def _connect_tcp(name, spec, ip, port):
+    """Koneksi socket ke sensor TCP dengan timeout dibatasi sisa waktu siklus (None jika sudah lewat)."""
+    timeout = spec.get('timeout', 3)
+    left = time_left()
+    if left is not None:
+        if left <= 0:
+            deadline_passed(name)
+            return None
+        timeout = min(timeout, left)
+    return socket.create_connection((ip, port), timeout=timeout)
+
+
+def _read_tcp(name, spec, plan, retries):
+    ip_env, port_env = spec['port_env']
+    ip = os.getenv(ip_env)
+    port = int(os.getenv(port_env))
+
+    print(f"Menghubungkan ke sensor Modbus TCP {name} ({ip}:{port})...")
+    sock = _connect_tcp(name, spec, ip, port)
+    if sock is None:
+        return {}
+    values = {}
+    pending = list(plan)
+    transaction_id = 0
+    try:
+        while pending:
+            block = pending.pop(0)
+            if deadline_passed(name):
+                break
+            transaction_id += 1
+            frame = modbus_tcp.read_request(
+                transaction_id, spec['slave_id'], spec['function'], block['start'], block['count']
+            )
+            for attempt in range(1, retries + 1):
+                if attempt > 1:
+                    metrics.count("retry", name)
+                if sock is None:
+                    # Respons terlambat dari request sebelumnya bisa masih ada di stream:
+                    # setelah gagal selalu mulai dari koneksi baru
+                    try:
+                        sock = _connect_tcp(name, spec, ip, port)
+                    except OSError as e:
+                        print(f"[MODBUS] Gagal menyambung ulang {name}: {e}")
+                        return values
+                    if sock is None:
+                        return values
+                try:
+                    with metrics.timer("register", name, f"0x{block['start']:04X}"):
+                        payload = modbus_tcp.transaction(sock, frame, label=name)
+                except modbus_rtu.IllegalAddressError:
+                    if len(block['names']) > 1:
+                        pending[:0] = split_block(name, block)
+                    else:
+                        print(f"[MODBUS] Register 0x{block['start']:04X} ({block['names'][0]}) ditolak {name}, field dilewati.")
+                    break
+                if payload is not None:
+                    values.update(decode(block, payload))
+                    break
+                print(f"Percobaan {attempt}/{retries}: Response {name} tidak valid.")
+                sock.close()
+                sock = None
+    finally:
+        if sock is not None:
+            sock.close()
+    return values
+
+
+def read_sensor(name):
+    """
+    Membaca semua blok register satu sensor sesuai SENSOR_MAPS.
+
+    Jumlah retry per blok diatur oleh circuit breaker sensor; jika breaker
+    sedang open, sensor dilewati dan dict kosong dikembalikan.
+
+    Return:
+        dict | None: nama field -> nilai (field yang gagal dibaca tidak ada di dict),
+        atau None jika port sensor tidak tersedia.
+    """
+    spec = SENSOR_MAPS[name]
+    plan = get_plan(name)
+    breaker = get_breaker(name)
+
+    if not breaker.allow():
+        print(f"[BREAKER] ⏭️ {name} sedang open, pembacaan dilewati pada siklus ini.")
+        metrics.count("skipped", name)
+        return {}
+    retries = breaker.retry_budget(spec.get('retries', 1))
+
+    try:
+        with metrics.timer("sensor", name):
+            if spec['transport'] == 'tcp':
+                values = _read_tcp(name, spec, plan, retries)
+            else:
+                values = _read_rtu(name, spec, plan, retries)
+    except Exception:
+        metrics.count("error", name)
+        breaker.record_failure()
+        raise
+
+    left = time_left()
+    if values:
+        breaker.record_success()
+    elif values is not None and left is not None and left <= 0:
+        # Dibatalkan oleh batas waktu siklus, bukan kegagalan sensor
+        pass
+    else:
+        breaker.record_failure()
+    if values is None:
+        return None
+
+    for field, compute in spec.get('derived', []):
+        try:
+            values[field] = round(compute(values), 2)
+        except (KeyError, TypeError):
+            pass
+    return values
+
+
+def get_sensor_data(name):
+    """
+    Antarmuka get_*_data() untuk main.py.
+
+    Return:
+        tuple sesuai urutan 'outputs' (None untuk field yang gagal),
+        tuple berisi None jika modul tidak aktif,
+        atau None jika port tidak tersedia / tidak ada satu pun data terbaca.
+    """
+    spec = SENSOR_MAPS[name]
+    outputs = spec['outputs']
+    status = os.getenv(spec['status_env'])
+
+    if not status or status.lower() != "active":
+        print(f"[INFO] Modul {name} tidak aktif. Melewati pembacaan data.")
+        return (None,) * len(outputs)
+
+    try:
+        print(f"[INFO] Modul {name} aktif. Melakukan pembacaan data.")
+        values = read_sensor(name)
+    except Exception as e:
+        print(f"[ERROR] Gagal membaca data {name}: {e}")
+        return None
+
+    if not values:
+        return None
+    return tuple(values.get(field) for field in outputs)
@@ -0,0 +1,160 @@
+import serial
+
+# =============================
+# Definisi sensor Modbus
+# =============================
+# Setiap sensor dideskripsikan sebagai data:
+#   transport  : 'rtu' (serial RS-485) atau 'tcp' (Modbus TCP)
+#   status_env : variabel env status (active / inactive)
+#   port_env   : variabel env port serial, atau (ip_env, port_env) untuk TCP
+#   serial     : pengaturan port serial (khusus RTU)
+#   slave_id   : alamat slave / unit id
+#   function   : 0x03 (holding register) atau 0x04 (input register)
+#   retries    : jumlah percobaan per blok register
+#   max_gap    : (opsional) jarak kosong maks antar register dalam satu blok baca,
+#                menggantikan MODBUS_BLOCK_GAP untuk device tertentu. Blok yang
+#                ditolak dengan exception 02/03 otomatis dipecah per field.
+#   fields     : daftar field (nama output, alamat register, tipe, skala, offset)
+#                nilai = raw * skala + offset, dibulatkan 2 desimal
+#   derived    : field turunan yang dihitung dari field lain setelah decode
+#   outputs    : urutan tuple yang dikembalikan ke main.py
+#
+# Tipe data memakai format big-endian struct/numpy:
+#   '>f' float32 (2 register), '>H' uint16, '>h' int16, '>I' uint32, '>i' int32
+
+SENSOR_MAPS = {
+    'AT500': {
+        'transport': 'rtu',
+        'status_env': 'AT500_STATUS',
+        'port_env': 'AT500_PORT',
+        'serial': {'baudrate': 19200, 'parity': serial.PARITY_EVEN},
+        'slave_id': 0x01,
+        'function': 0x03,
+        'retries': 10,
+        'fields': [
+            ('conduct', 0x1582, '>f', 1, 0),
+            ('salinity', 0x1597, '>f', 1, 0),
+            ('tds', 0x159E, '>f', 1, 0),
+            ('ph', 0x15BA, '>f', 1, 0),
+            ('orp', 0x15C8, '>f', 1, 0),
+            ('do', 0x15CF, '>f', 1, 0),
+            ('nh3n', 0x1669, '>f', 1, 0),
+        ],
+        'outputs': ('ph', 'orp', 'tds', 'conduct', 'do', 'salinity', 'nh3n'),
+    },
+    'RT200': {
+        'transport': 'rtu',
+        'status_env': 'RT200_STATUS',
+        'port_env': 'RT200_PORT',
+        'serial': {'baudrate': 19200, 'parity': serial.PARITY_EVEN},
+        'slave_id': 0x05,
+        'function': 0x03,
+        'retries': 5,
+        'fields': [
+            ('wpress', 0x0025, '>f', 1, 0),
+            ('wtemp', 0x002D, '>f', 1, 0),
+            ('depth', 0x0035, '>f', 30.48, 0),  # Konversi dari feet ke cm
+        ],
+        'outputs': ('wtemp', 'wpress', 'depth'),
+    },
+    'SEM5096': {
+        'transport': 'rtu',
+        'status_env': 'SEM5096_STATUS',
+        'port_env': 'SEM5096_PORT',
+        'serial': {'baudrate': 9600, 'parity': serial.PARITY_NONE},
+        'slave_id': 0xFF,
+        'function': 0x03,
+        'retries': 1,
+        'fields': [
+            ('atemp', 0x0009, '>H', 0.01, -40),
+            ('hum', 0x000A, '>H', 0.01, 0),
+            ('apress', 0x000B, '>H', 0.1, 0),
+            ('wspeed', 0x000C, '>H', 0.01, 0),
+            ('wdir', 0x000D, '>H', 0.1, 0),
+            ('rain', 0x000E, '>H', 0.1, 0),
+            ('srad', 0x000F, '>H', 1, 0),
+        ],
+        'outputs': ('atemp', 'hum', 'apress', 'wspeed', 'wdir', 'rain', 'srad'),
+    },
+    'MACE': {
+        'transport': 'rtu',
+        'status_env': 'MACE_STATUS',
+        'port_env': 'MACE_PORT',
+        'serial': {'baudrate': 19200, 'parity': serial.PARITY_NONE},
+        'slave_id': 0x01,
+        'function': 0x04,
+        'retries': 1,
+        'fields': [
+            ('battery', 0x0000, '>f', 1, 0),
+            ('depth', 0x0002, '>f', 1, 0),
+            ('flow', 0x0004, '>f', 1, 0),
+            ('tflow', 0x0006, '>f', 1, 0),
+        ],
+        'outputs': ('battery', 'depth', 'flow', 'tflow'),
+    },
+    'SPECTRO': {
+        'transport': 'tcp',
+        'status_env': 'SPECTRO_STATUS',
+        'port_env': ('SPECTRO_IP', 'SPECTRO_PORT'),
+        'timeout': 3,
+        'slave_id': 0xFF,
+        'function': 0x04,
+        'retries': 1,
+        'fields': [
+            ('turb', 0x0082, '>f', 1, 0),
+            ('tss', 0x008A, '>f', 1, 0),
+            ('cod', 0x0092, '>f', 1, 0),
+            ('bod', 0x009A, '>f', 1, 0),
+            ('no3', 0x00A2, '>f', 1, 0),
+            ('wtemp', 0x00AA, '>f', 1, 0),
+        ],
+        'outputs': ('turb', 'tss', 'cod', 'bod', 'no3', 'wtemp'),
+    },
+    'ISCAN': {
+        'transport': 'rtu',
+        'status_env': 'ISCAN_STATUS',
+        'port_env': 'ISCAN_PORT',
+        'serial': {'baudrate': 38400, 'parity': serial.PARITY_ODD},
+        'slave_id': 0x02,
+        'function': 0x04,
+        'retries': 3,
+        'fields': [
+            ('tss', 0x0082, '>f', 1, 0),
+            ('cod', 0x008A, '>f', 1, 0),
+            ('wtemp', 0x00BA, '>f', 1, 0),
+        ],
+        'outputs': ('cod', 'tss', 'wtemp'),
+    },
+    'LTNC': {
+        'transport': 'rtu',
+        'status_env': 'LTNC_STATUS',
+        'port_env': 'LTNC_PORT',
+        'serial': {'baudrate': 19200, 'parity': serial.PARITY_EVEN},
+        'slave_id': 0x01,
+        'function': 0x03,
+        'retries': 3,
+        'fields': [
+            ('depth', 0x17F8, '>f', 0.01, 0),
+        ],
+        'derived': [
+            ('flow', lambda v: 1.34 * (v['depth'] * v['depth'])),
+        ],
+        'outputs': ('depth', 'flow'),
+    },
+    'CONTLYTE': {
+        'transport': 'rtu',
+        'status_env': 'CONTLYTE_STATUS',
+        'port_env': 'CONTLYTE_PORT',
+        'serial': {'baudrate': 38400, 'parity': serial.PARITY_EVEN},
+        'slave_id': 0x02,
+        'function': 0x04,
+        'retries': 3,
+        'fields': [
+            ('ph', 0x0082, '>f', 1, 0),
+            ('tss', 0x008A, '>f', 1, 0),
+            ('cod', 0x0092, '>f', 1, 0),
+            ('wtemp', 0x009A, '>f', 1, 0),
+        ],
+        'outputs': ('ph', 'tss', 'cod', 'wtemp'),
+    },
+}
@@ -0,0 +1,110 @@
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import serial
+
+# Waktu stabilisasi adapter USB-RS485 setelah port baru dibuka
+OPEN_SETTLE = 0.2
+
+_ports = {}        # path asli port -> objek serial.Serial yang tetap terbuka
+_settings = {}     # path asli port -> pengaturan yang sedang dipakai
+_locks = {}        # path asli port -> lock transaksi per bus
+_registry_lock = threading.Lock()
+
+
+def _key(port):
+    """Path asli port: symlink (mis. /dev/serial/by-id/...) ke device yang sama berbagi satu koneksi dan lock."""
+    return os.path.realpath(port)
+
+
+def port_lock(port):
+    """Lock per port agar hanya satu transaksi yang berjalan di satu bus."""
+    key = _key(port)
+    with _registry_lock:
+        lock = _locks.get(key)
+        if lock is None:
+            lock = _locks[key] = threading.RLock()
+        return lock
+
+
+def get_serial(port, baudrate, parity=serial.PARITY_NONE, stopbits=serial.STOPBITS_ONE,
+               bytesize=serial.EIGHTBITS, timeout=1):
+    """
+    Mengambil koneksi serial dari pool. Port dibuka sekali dan dipakai ulang
+    antar siklus; jika sensor lain di bus yang sama memakai pengaturan berbeda,
+    pengaturan diterapkan ulang tanpa menutup port.
+    """
+    settings = {
+        'baudrate': baudrate,
+        'parity': parity,
+        'stopbits': stopbits,
+        'bytesize': bytesize,
+        'timeout': timeout,
+    }
+
+    key = _key(port)
+    # Buka / settle di bawah lock port itu sendiri: bus lain tetap bisa membuka port paralel
+    with port_lock(port):
+        with _registry_lock:
+            ser = _ports.get(key)
+        if ser is not None and ser.is_open:
+            if _settings.get(key) != settings:
+                ser.apply_settings(settings)
+                _settings[key] = settings
+            return ser
+
+        ser = serial.Serial(port=port, **settings)
+        time.sleep(OPEN_SETTLE)
+        with _registry_lock:
+            _ports[key] = ser
+            _settings[key] = settings
+        print(f"[SERIAL] 🔌 Port {port} dibuka ({baudrate} {bytesize}{parity}{stopbits}).")
+        return ser
+
+
+def invalidate(port):
+    """Menutup dan membuang koneksi port, misalnya setelah adapter dicabut (ENODEV/EIO)."""
+    key = _key(port)
+    with _registry_lock:
+        ser = _ports.pop(key, None)
+        _settings.pop(key, None)
+    if ser is not None:
+        try:
+            ser.close()
+        except Exception:
+            pass
+        print(f"[SERIAL] ♻️ Koneksi {port} direset, akan dibuka ulang pada percobaan berikutnya.")
+
+
+@contextmanager
+def open_port(port, **settings):
+    """
+    Context manager untuk satu transaksi: mengunci bus, mengambil koneksi dari pool
+    dan mereset koneksi jika terjadi error I/O sehingga percobaan berikutnya
+    otomatis membuka ulang port.
+    """
+    with port_lock(port):
+        try:
+            yield get_serial(port, **settings)
+        except (serial.SerialException, OSError):
+            invalidate(port)
+            raise
+
+
+def close_all():
+    """Menutup semua port yang masih terbuka di pool."""
+    with _registry_lock:
+        ports = list(_ports.items())
+        _ports.clear()
+        _settings.clear()
+    for _, ser in ports:
+        try:
+            ser.close()
+        except Exception:
+            pass
+
+
+atexit.register(close_all)
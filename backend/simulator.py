@@ -0,0 +1,233 @@
+import argparse
+import os
+import random
+import select
+import socketserver
+import struct
+import threading
+import time
+import tty
+
+import modbus_crc
+import modbus_tcp
+from sensor_maps import SENSOR_MAPS
+
+# Nilai tipikal per parameter, dipakai sebagai isi register sensor virtual (±1% noise)
+SIM_VALUES = {
+    'ph': 7.2, 'orp': 150.0, 'tds': 320.0, 'conduct': 640.0, 'do': 6.5, 'salinity': 0.3, 'nh3n': 0.8,
+    'battery': 12.6, 'depth': 45.0, 'flow': 3.2, 'tflow': 1520.0,
+    'turb': 12.0, 'tss': 25.0, 'cod': 40.0, 'bod': 12.0, 'no3': 1.5,
+    'atemp': 29.1, 'wtemp': 27.5, 'apress': 1009.0, 'wpress': 1.2,
+    'hum': 78.0, 'wspeed': 2.4, 'wdir': 135.0, 'rain': 0.0, 'srad': 450.0,
+}
+
+
+class Faults:
+    """
+    Pengaturan gangguan sensor virtual.
+
+    latency : waktu proses sensor sebelum membalas (detik)
+    jitter  : variasi acak latency (detik, ±)
+    drop    : peluang request tidak dibalas (0..1)
+    corrupt : peluang CRC respons RTU dirusak (0..1)
+    wire    : tambahkan waktu kirim frame sesuai baudrate (11 bit per byte)
+    strict  : tolak request yang mencakup register tidak dipetakan (exception 02)
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, drop=0.0, corrupt=0.0, wire=True, strict=False):
+        self.latency = latency
+        self.jitter = jitter
+        self.drop = drop
+        self.corrupt = corrupt
+        self.wire = wire
+        self.strict = strict
+
+    def delay(self):
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+
+class VirtualSensor:
+    """Image register satu sensor dari SENSOR_MAPS, diisi ulang dengan nilai baru tiap request."""
+
+    def __init__(self, name, faults):
+        self.name = name
+        self.spec = SENSOR_MAPS[name]
+        self.faults = faults
+        self.requests = 0
+        self.dropped = 0
+        self.corrupted = 0
+
+    def registers(self):
+        """dict alamat -> word 16-bit dengan nilai baru untuk semua field."""
+        words = {}
+        for field, address, fmt, scale, offset in self.spec['fields']:
+            value = SIM_VALUES.get(field, 10.0) * random.uniform(0.99, 1.01)
+            raw = (value - offset) / scale
+            if fmt[-1] in 'HhIi':
+                raw = int(round(raw))
+                if fmt[-1] == 'H':
+                    raw = min(max(raw, 0), 0xFFFF)
+            data = struct.pack(fmt, raw)
+            for i in range(0, len(data), 2):
+                words[address + i // 2] = data[i:i + 2]
+        return words
+
+    def read(self, address, count):
+        """
+        Payload register (big-endian) untuk request baca; register kosong bernilai 0,
+        atau None jika mode strict dan rentang mencakup register kosong.
+        """
+        words = self.registers()
+        if self.faults.strict and any(address + i not in words for i in range(count)):
+            return None
+        return b''.join(words.get(address + i, b'\x00\x00') for i in range(count))
+
+    def should_drop(self):
+        self.requests += 1
+        if random.random() < self.faults.drop:
+            self.dropped += 1
+            return True
+        return False
+
+
+def serve_rtu(sensor, master_fd, stop):
+    """Loop pty master: menerima frame request RTU dan membalas seperti sensor fisik."""
+    baudrate = sensor.spec['serial']['baudrate']
+    buffer = b''
+    while not stop.is_set():
+        ready, _, _ = select.select([master_fd], [], [], 0.2)
+        if not ready:
+            continue
+        try:
+            buffer += os.read(master_fd, 256)
+        except OSError:
+            break
+
+        # Request baca 03/04 selalu 8 byte; geser satu byte jika CRC tidak cocok (resync)
+        while len(buffer) >= 8:
+            frame, buffer = buffer[:8], buffer[8:]
+            if not modbus_crc.check_crc(frame):
+                buffer = frame[1:] + buffer
+                continue
+            slave_id, function_code, address, count = struct.unpack('>BBHH', frame[:6])
+            if slave_id != sensor.spec['slave_id'] or sensor.should_drop():
+                continue
+
+            payload = sensor.read(address, count) if function_code == sensor.spec['function'] else None
+            if function_code != sensor.spec['function']:
+                response = modbus_crc.append_crc(bytearray([slave_id, function_code | 0x80, 0x01]))
+            elif payload is None:
+                response = modbus_crc.append_crc(bytearray([slave_id, function_code | 0x80, 0x02]))
+            else:
+                response = modbus_crc.append_crc(bytearray([slave_id, function_code, len(payload)]) + payload)
+            if random.random() < sensor.faults.corrupt:
+                sensor.corrupted += 1
+                response[-1] ^= 0xFF
+
+            delay = sensor.faults.delay()
+            if sensor.faults.wire:
+                delay += (len(frame) + len(response)) * 11 / baudrate
+            time.sleep(delay)
+            os.write(master_fd, bytes(response))
+
+
+def start_rtu(name, faults, stop):
+    """Membuka pasangan pty untuk satu sensor RTU. Return (sensor, path port slave)."""
+    master_fd, slave_fd = os.openpty()
+    tty.setraw(master_fd)
+    tty.setraw(slave_fd)
+    sensor = VirtualSensor(name, faults)
+    threading.Thread(target=serve_rtu, args=(sensor, master_fd, stop), daemon=True,
+                     name=f"sim-{name}").start()
+    # slave_fd tetap terbuka agar pty tidak tertutup saat driver menutup port
+    sensor.slave_fd = slave_fd
+    return sensor, os.ttyname(slave_fd)
+
+
+def start_tcp(name, faults):
+    """Menjalankan listener Modbus TCP lokal untuk satu sensor. Return (sensor, server)."""
+    sensor = VirtualSensor(name, faults)
+
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self):
+            while True:
+                request = modbus_tcp.recv_exact(self.request, 12)
+                if len(request) < 12:
+                    return
+                transaction_id, _, _, unit_id, function_code, address, count = struct.unpack('>HHHBBHH', request)
+                if sensor.should_drop():
+                    continue
+                payload = sensor.read(address, count) if function_code == sensor.spec['function'] else None
+                if function_code != sensor.spec['function']:
+                    pdu = struct.pack('>BB', function_code | 0x80, 0x01)
+                elif payload is None:
+                    pdu = struct.pack('>BB', function_code | 0x80, 0x02)
+                else:
+                    pdu = struct.pack('>BB', function_code, len(payload)) + payload
+                time.sleep(sensor.faults.delay())
+                header = struct.pack('>HHHB', transaction_id, 0, len(pdu) + 1, unit_id)
+                self.request.sendall(header + pdu)
+
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name=f"sim-{name}").start()
+    return sensor, server
+
+
+def start_simulator(names=None, faults=None):
+    """
+    Menjalankan sensor virtual untuk semua (atau sebagian) sensor di SENSOR_MAPS.
+
+    Return:
+        (dict, dict, threading.Event): variabel env -> nilai (port pty / IP / port TCP),
+        nama sensor -> VirtualSensor, dan event untuk menghentikan simulator.
+    """
+    faults = faults or Faults()
+    stop = threading.Event()
+    env, sensors = {}, {}
+    for name in names or SENSOR_MAPS:
+        spec = SENSOR_MAPS[name]
+        if spec['transport'] == 'tcp':
+            sensor, server = start_tcp(name, faults)
+            ip_env, port_env = spec['port_env']
+            env[ip_env], env[port_env] = server.server_address[0], str(server.server_address[1])
+            threading.Thread(target=lambda s=server: (stop.wait(), s.shutdown()), daemon=True).start()
+        else:
+            sensor, path = start_rtu(name, faults, stop)
+            env[spec['port_env']] = path
+        env[spec['status_env']] = "active"
+        sensors[name] = sensor
+    return env, sensors, stop
+
+
+def build_parser(description=None):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--sensors', nargs='*', choices=list(SENSOR_MAPS), help="Sensor yang disimulasikan (default semua)")
+    parser.add_argument('--latency', type=float, default=20, help="Waktu proses sensor (ms)")
+    parser.add_argument('--jitter', type=float, default=5, help="Variasi latency (ms, ±)")
+    parser.add_argument('--drop', type=float, default=0.0, help="Peluang request tidak dibalas (0..1)")
+    parser.add_argument('--corrupt', type=float, default=0.0, help="Peluang CRC respons dirusak (0..1)")
+    parser.add_argument('--no-wire', action='store_true', help="Tanpa waktu kirim frame sesuai baudrate")
+    parser.add_argument('--strict', action='store_true', help="Tolak blok yang mencakup register tidak dipetakan (exception 02)")
+    return parser
+
+
+def faults_from_args(args):
+    return Faults(args.latency / 1000, args.jitter / 1000, args.drop, args.corrupt, wire=not args.no_wire, strict=args.strict)
+
+
+if __name__ == "__main__":
+    args = build_parser(description="Simulator sensor Modbus RTU (pty) dan Modbus TCP").parse_args()
+    env, sensors, stop = start_simulator(args.sensors, faults_from_args(args))
+    print("[SIMULATOR] ✅ Sensor virtual berjalan. Gunakan variabel env berikut:")
+    for key, value in env.items():
+        print(f'{key}="{value}"')
+    try:
+        while True:
+            time.sleep(60)
+            print("[SIMULATOR] " + ", ".join(
+                f"{name}: {s.requests} req, {s.dropped} drop, {s.corrupted} crc" for name, s in sensors.items()))
+    except KeyboardInterrupt:
+        stop.set()
+        print("\n[SIMULATOR] 🛑 Simulator dihentikan.")
@@ -0,0 +1,166 @@
+import os
+import re
+import sqlite3
+from datetime import date, datetime
+
+# =============================
+# Backend penyimpanan: MySQL atau SQLite
+# =============================
+# DB_BACKEND=mysql (default) memakai server MySQL; DB_BACKEND=sqlite memakai
+# satu file SQLite (WAL) di DB_SQLITE_PATH tanpa server. Koneksi SQLite
+# dibungkus agar API-nya sama dengan mysql.connector (placeholder %s,
+# cursor(dictionary=True), `with conn` / `with conn.cursor()`), sehingga query
+# yang ada cukup memakai storage.connect() dan storage.Error.
+
+DEFAULT_SQLITE_PATH = "/opt/logix/database/logix.db"
+
+
+def backend():
+    return (os.getenv("DB_BACKEND") or "mysql").strip().lower()
+
+
+def is_sqlite():
+    return backend() == "sqlite"
+
+
+def sqlite_path():
+    return os.getenv("DB_SQLITE_PATH", DEFAULT_SQLITE_PATH)
+
+
+def mysql_config():
+    return {
+        'host': os.getenv('DB_HOST'),
+        'user': os.getenv('DB_USER'),
+        'password': os.getenv('DB_PASSWORD'),
+        'database': os.getenv('DB_NAME'),
+        'port': int(os.getenv('DB_PORT') or 3306),
+        # Batasi waktu tunggu saat MySQL mati agar journal cepat mengambil alih
+        'connection_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', '5')),
+    }
+
+
+# Kesalahan database dari kedua backend (untuk `except storage.Error`)
+try:
+    import mysql.connector
+    Error = (sqlite3.Error, mysql.connector.Error)
+except ImportError:
+    Error = (sqlite3.Error,)
+
+
+# DATETIME disimpan sebagai teks 'YYYY-MM-DD HH:MM:SS' (urut secara leksikal)
+# dan dibaca kembali sebagai datetime, sama seperti mysql.connector
+sqlite3.register_adapter(datetime, lambda value: value.strftime("%Y-%m-%d %H:%M:%S"))
+sqlite3.register_adapter(date, lambda value: value.strftime("%Y-%m-%d"))
+
+
+def _convert_datetime(value):
+    try:
+        return datetime.fromisoformat(value.decode())
+    except ValueError:
+        return value.decode()
+
+
+sqlite3.register_converter("DATETIME", _convert_datetime)
+
+_PLACEHOLDER = re.compile(r"%(s|%)")
+
+
+def _translate(query):
+    """Placeholder format mysql.connector (%s, %%) -> qmark SQLite (?, %)."""
+    return _PLACEHOLDER.sub(lambda match: "?" if match.group(1) == "s" else "%", query)
+
+
+class SQLiteCursor:
+    def __init__(self, cursor, dictionary=False):
+        self._cursor = cursor
+        self._dictionary = dictionary
+
+    def execute(self, query, params=()):
+        self._cursor.execute(_translate(query), tuple(params or ()))
+        return self
+
+    def executemany(self, query, rows):
+        self._cursor.executemany(_translate(query), [tuple(row) for row in rows])
+        return self
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return dict(zip([column[0] for column in self._cursor.description], row))
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def __iter__(self):
+        return (self._row(row) for row in self._cursor)
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def close(self):
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SQLiteConnection:
+    """
+    Koneksi SQLite dengan antarmuka mysql.connector. WAL + synchronous=NORMAL:
+    pembaca (web, KLHK) tidak memblok penulis, fsync dikelompokkan per checkpoint.
+    Keluar dari `with` menutup koneksi tanpa commit, sama seperti MySQL.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or sqlite_path()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn = sqlite3.connect(
+            self.path, timeout=30, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+
+    def cursor(self, dictionary=False, prepared=False, **kwargs):
+        # prepared: sqlite3 sudah menyimpan statement yang dipakai ulang di cache-nya
+        return SQLiteCursor(self.conn.cursor(), dictionary)
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        self.conn.rollback()
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def connect():
+    """Koneksi baru ke backend yang dipilih di config/env (DB_BACKEND)."""
+    if is_sqlite():
+        return SQLiteConnection()
+    import mysql.connector
+    return mysql.connector.connect(**mysql_config())
@@ -269,7 +269,8 @@ async function renderHistoryChart() {
         const values = data.values;
 
         // Konversi ke array baru dengan null untuk gap > 6 menit
-        const gapThreshold = config.gapweb; // dalam menit
+        // Data rollup berjarak 1 jam / 1 hari: gap baru dihitung jika lebih dari 2 bucket
+        const gapThreshold = Math.max(config.gapweb, 2 * (data.resolution || 0) / 60); // dalam menit
         const processedX = [];
         const processedY = [];
 
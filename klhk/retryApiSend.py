@@ -1,5 +1,4 @@
 import time
-import mysql.connector
 from datetime import datetime
 from collections import defaultdict
 import pytz
@@ -7,8 +6,13 @@ import requests
 import json
 import jwt
 import os
+import sys
 from dotenv import load_dotenv
 
+# Modul bersama ada di folder backend
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+import storage
+
 # Tentukan path file .env di subfolder 'config'
 env_path = "/opt/logix/config/env"
 if not load_dotenv(dotenv_path=env_path):
@@ -16,10 +20,6 @@ if not load_dotenv(dotenv_path=env_path):
     exit(1)
 
 
-HOST = os.getenv('DB_HOST')
-USER = os.getenv('DB_USER')
-PASSWORD = os.getenv('DB_PASSWORD')
-DATABASE = os.getenv('DB_NAME')
 TIMEZONA = os.getenv('TIMEZONE', 'Asia/Jakarta')
 
 API_ENDPOINT = os.getenv('KLHK_API_URL')  # Ganti dengan URL API Anda
@@ -28,14 +28,6 @@ UID = os.getenv('KLHK_UID')
 
 MAX_DUP_RETRY = int(os.getenv('KLHK_MAX_DUP_RETRY', 3))   # batasan terjadi perulangan script duplikasi agar tidak terus menerus
 duplicate_attempt=0
-# Konfigurasi koneksi database MySQL
-MYSQL_CONFIG = {
-    'host': HOST,         # ganti dengan host MySQL Anda
-    'user': USER,         # ganti dengan username MySQL Anda
-    'password': PASSWORD, # ganti dengan password MySQL Anda
-    'database': DATABASE  # ganti dengan nama database MySQL Anda
-}
-
 # Timezone
 tz = pytz.timezone(TIMEZONA)
 
@@ -81,7 +73,7 @@ def ambil_data():
     cursor = None
     try:
         # Menggunakan context manager untuk koneksi dan cursor
-        conn = mysql.connector.connect(**MYSQL_CONFIG)
+        conn = storage.connect()
         cursor = conn.cursor()
 
         # Eksekusi query untuk mengambil data dari tabel
@@ -137,7 +129,7 @@ def ambil_data():
                         
             send_data_to_api(group, start, end,duplicate_attempt)
 
-    except mysql.connector.Error as db_err:
+    except storage.Error as db_err:
         print(f"[{datetime.now()}] Error pada koneksi database: {db_err}")
         write_log(f"Error pada koneksi database: {db_err}")
     except Exception as e:
@@ -158,7 +150,7 @@ def send_data_to_api(data, start, end,duplicate_attempt):
     cursor = None
     try:
         # Membuka koneksi dan cursor
-        conn = mysql.connector.connect(**MYSQL_CONFIG)
+        conn = storage.connect()
         cursor = conn.cursor()
 
         if not data:
@@ -227,11 +219,11 @@ def send_data_to_api(data, start, end,duplicate_attempt):
                     write_log(f"Duplikasi terdeteksi {duplicate_attempt} kali, menghentikan percobaan...")
                     try:
                         # Membuka koneksi dan cursor untuk update status
-                        with mysql.connector.connect(**MYSQL_CONFIG) as conn:
+                        with storage.connect() as conn:
                             with conn.cursor() as cursor:
                                 cursor.execute("UPDATE tmp SET status='Duplikasi', keterangan='Duplikasi tidak teratasi, lakukan manual check' WHERE date >=%s AND date <=%s", [start, end])
                                 conn.commit()
-                    except mysql.connector.Error as db_err:
+                    except storage.Error as db_err:
                         write_log(f"Error saat mencoba update status duplikasi di database: {db_err}")
                     finally:
                         if cursor:
@@ -283,7 +275,7 @@ def send_data_to_api(data, start, end,duplicate_attempt):
                 cursor.execute("UPDATE tmp SET status='retry', keterangan=%s WHERE date >=%s AND date <=%s", [response.text, start, end])
                 conn.commit()
 
-    except mysql.connector.Error as db_err:
+    except storage.Error as db_err:
         print(f"[{datetime.now()}] Error pada koneksi database: {db_err}")
         write_log(f"Error pada koneksi database: {db_err}")
     except Exception as e:
@@ -1,14 +1,18 @@
-import time
 import os
+import sys
 import json
 import pytz
 import jwt  # Pastikan ini adalah PyJWT
 import requests
-import mysql.connector
 from datetime import datetime
 from collections import defaultdict
 from dotenv import load_dotenv
 
+# Modul bersama ada di folder backend
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+from scheduler import IntervalScheduler
+import storage
+
 # Load environment variables
 env_path = "/opt/logix/config/env"
 if not load_dotenv(dotenv_path=env_path):
@@ -20,13 +24,6 @@ if not load_dotenv(dotenv_path=env_path):
 TIMEZONE = os.getenv('TIMEZONE', 'Asia/Jakarta')
 tz = pytz.timezone(TIMEZONE)
 
-#Database Config
-HOST = os.getenv('DB_HOST')
-USER = os.getenv('DB_USER')
-PASSWORD = os.getenv('DB_PASSWORD')
-DATABASE = os.getenv('DB_NAME')
-PORT = int(os.getenv('DB_PORT'))
-
 #KLHK config
 FIELDS = os.getenv("KLHK_FIELDS").split(",")
 STATUS = os.getenv("KLHK_STATUS")
@@ -37,14 +34,6 @@ MAX_DUP_RETRY = int(os.getenv('KLHK_MAX_DUP_RETRY', 3))
 
 duplicate_attempt = 0
 
-MYSQL_CONFIG = {
-    'host': HOST,
-    'user': USER,
-    'password': PASSWORD,
-    'database': DATABASE,
-    'port': PORT
-}
-
 def write_log(message):
     timestamp = datetime.now(tz).strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{timestamp}] {message}")
@@ -69,7 +58,7 @@ def ambil_data():
     grouped_data = defaultdict(list)
 
     try:
-        with mysql.connector.connect(**MYSQL_CONFIG) as conn:
+        with storage.connect() as conn:
             with conn.cursor() as cursor:
                 query_fields = ", ".join(["`date`"] + FIELDS)
                 cursor.execute(f"SELECT {query_fields} FROM tmp WHERE status IS NULL AND `date` < %s", [now])
@@ -99,7 +88,7 @@ def ambil_data():
 
                     write_log(f"📊 Mengumpulkan data jam {start} - {end} dengan {len(payload)} entri")
                     send_data_to_api(payload, start, end)
-    except mysql.connector.Error as e:
+    except storage.Error as e:
         write_log(f"❌ DB Error: {e}")
     except Exception as e:
         write_log(f"❌ Error ambil_data: {e}")
@@ -115,7 +104,7 @@ def send_data_to_api(data, start, end):
     try:
         key_token = get_jwt_token()
         if not key_token:
-            with mysql.connector.connect(**MYSQL_CONFIG) as conn:
+            with storage.connect() as conn:
                 with conn.cursor() as cursor:
                     cursor.execute("UPDATE tmp SET status='retry', keterangan='Gagal dapat token JWT' WHERE `date` >=%s AND `date` <=%s", [start, end])
                     conn.commit()
@@ -138,7 +127,7 @@ def send_data_to_api(data, start, end):
         result = response.json()
 
         write_log(f"API Response : {response.text}")
-        with mysql.connector.connect(**MYSQL_CONFIG) as conn:
+        with storage.connect() as conn:
             with conn.cursor() as cursor:
                 if result.get("status"):
                     now = datetime.now(tz)
@@ -181,21 +170,13 @@ def send_data_to_api(data, start, end):
 
 def scheduler():
     write_log("⏱️ Service aktif. Menunggu eksekusi setiap jam pada menit ke-0")
-    last_run = None
     try:
-        while True:
-            now = datetime.now(tz)
-            if now.minute == 0 and now.second == 0:
-                key_time = now.replace(minute=0, second=0, microsecond=0)
-                if last_run != key_time:
-                    
-                    if STATUS.lower() != "active":
-                        write_log("ℹ️ Module KLHK Send tidak aktif. Melewati eksekusi.")
-                    else:   
-                        write_log(f"⏳ Menjalankan scheduler pada {now}")
-                        ambil_data()      
-                    last_run = key_time
-            time.sleep(1)
+        for tick in IntervalScheduler(60, tz=tz, name="KLHK"):
+            if STATUS.lower() != "active":
+                write_log("ℹ️ Module KLHK Send tidak aktif. Melewati eksekusi.")
+            else:   
+                write_log(f"⏳ Menjalankan scheduler pada {tick}")
+                ambil_data()      
     except KeyboardInterrupt:
         write_log("🛑 Service dihentikan manual.")
 